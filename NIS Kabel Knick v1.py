@@ -4,14 +4,19 @@ from plotly.colors import sample_colorscale
 from plotly.subplots import make_subplots
 import plotly.io as pio
 
+from src.utils import (biot_savart, conductors, frame_payload, isoline, marching_squares, result_cache, slice_server,
+                       slice_stack, volume_store)
+
 # Browser-Ausgabe erzwingen
 pio.renderers.default = 'browser'
 
 # --- 1. Parameter ---
 I_rms, f, mu_0 = 2000.0, 50.0, 4 * np.pi * 1e-7
-L_calc, L_plot, r_wire = 2000000.0, 100.0, 0.01
+L_calc, L_plot, r_wire = None, 100.0, 0.01  # L_calc=None: Zuleitungen exakt halbunendlich
 alpha_rad = np.radians(45.0)
 C_SCALE = 'Viridis'
+COMPACT_FRAMES = True  # True: Slider-Frames binär (uint16, log-quantisiert) und je Gitter nur einmal übertragen
+LAZY_SLICES = False  # True: Schnitte erst bei Bedarf in der Taipy-Oberfläche statt aller Slider-Frames im Voraus
 
 phases = [
     {'name':'L1', 'pos':(-6.0, 20.0), 'shift':0, 'color':'red'},
@@ -19,43 +24,16 @@ phases = [
     {'name':'L3', 'pos':(6.0, 20.0), 'shift':4 * np.pi / 3, 'color':'blue'}
 ]
 
-def get_b_vector_segment_vectorized(P_x, P_y, P_z, start, end, I_t):
-    L_vec = end - start
-    L_mag = np.linalg.norm(L_vec)
-    unit_L = L_vec / L_mag
-    dx, dy, dz = P_x - start[0], P_y - start[1], P_z - start[2]
-    d = dx * unit_L[0] + dy * unit_L[1] + dz * unit_L[2]
-    r_perp_x, r_perp_y, r_perp_z = dx - d * unit_L[0], dy - d * unit_L[1], dz - d * unit_L[2]
-    r_mag_raw = np.sqrt(r_perp_x**2 + r_perp_y**2 + r_perp_z**2)
-    r_mag = np.maximum(r_mag_raw, r_wire)
-    cos_theta1 = d / np.sqrt(d**2 + r_mag**2)
-    cos_theta2 = (L_mag - d) / np.sqrt((L_mag - d)**2 + r_mag**2)
-    B_mag = (mu_0 * I_t) / (4 * np.pi * r_mag) * (cos_theta1 + cos_theta2)
-    B_mag *= np.where(r_mag_raw < r_wire, r_mag_raw / r_wire, 1.0)
-    Bx_dir = unit_L[1] * r_perp_z - unit_L[2] * r_perp_y
-    By_dir = unit_L[2] * r_perp_x - unit_L[0] * r_perp_z
-    Bz_dir = unit_L[0] * r_perp_y - unit_L[1] * r_perp_x
-    dir_norm = np.maximum(np.sqrt(Bx_dir**2 + By_dir**2 + Bz_dir**2), 1e-12)
-    return B_mag * (Bx_dir / dir_norm), B_mag * (By_dir / dir_norm), B_mag * (Bz_dir / dir_norm)
-
-def calculate_field_with_bend(X, Y, Z):
-    t_steps = np.linspace(0, 1 / f, 12)
-    B_total_sq_sum = np.zeros_like(X)
-    Y_grid = np.full_like(X, Y) if np.isscalar(Y) else Y
-    Z_grid = np.full_like(X, Z) if np.isscalar(Z) else Z
-    for t in t_steps:
-        Bx_sum, By_sum, Bz_sum = np.zeros_like(X), np.zeros_like(X), np.zeros_like(X)
-        for p in phases:
-            I_t = I_rms * np.sqrt(2) * np.sin(2 * np.pi * f * t + p['shift'])
-            px, py = p['pos']
-            s1_start, s1_end = np.array([px, py, -L_calc / 2]), np.array([px, py, 0])
-            B1x, B1y, B1z = get_b_vector_segment_vectorized(X, Y_grid, Z_grid, s1_start, s1_end, I_t)
-            dir_vec = np.array([np.sin(alpha_rad), 0, np.cos(alpha_rad)])
-            s2_start, s2_end = s1_end, s1_end + (L_calc / 2) * dir_vec
-            B2x, B2y, B2z = get_b_vector_segment_vectorized(X, Y_grid, Z_grid, s2_start, s2_end, I_t)
-            Bx_sum += (B1x + B2x); By_sum += (B1y + B2y); Bz_sum += (B1z + B2z)
-        B_total_sq_sum += (Bx_sum**2 + By_sum**2 + Bz_sum**2)
-    return np.sqrt(B_total_sq_sum / len(t_steps)) * 1e6
+paths = conductors.get_paths_from_phases(phases, alpha_rad, L_calc)
+
+# Ergebnis-Cache auf der Festplatte: Schlüssel aus allen Eingaben, unveränderte Parameter laden in Millisekunden
+cache = result_cache.ResultCache()
+inputs = (paths, I_rms, f, mu_0, r_wire)
+
+# Feldberechnung: Phasor-Modus (exakter Effektivwert), mode="time_steps" rechnet die 12 Zeitschritte als Referenz
+def calculate_field_with_bend(X, Y, Z, mode="phasor"):
+    return biot_savart.calculate_field_with_bend(X, Y, Z, phases, I_rms, f, alpha_rad, L_calc=L_calc,
+                                                 r_wire=r_wire, mu_0=mu_0, mode=mode)
 
 # --- 2. Daten berechnen ---
 res = 80
@@ -69,6 +47,10 @@ L_plot_top = L_plot * 3
 coords_top = np.linspace(-L_plot_top / 2, L_plot_top / 2, res)
 X_top, Z_top = np.meshgrid(coords_top, coords_top)
 
+# Slider-Positionen: Frontschnitte entlang der Leitung (s) und Draufsichten je Höhe (y)
+s_slices = np.arange(-L_plot / 2, L_plot / 2 + 1, 1)
+y_slices = np.arange(0, int(y_coords_side.max()) + 1, 1)
+
 # Hilfsfunktion für Isolinien
 def add_contours_custom(fig, z_data, x, y, row, col, show_cb=False):
     htemp = "X: %{x:.1f}m<br>Y/Z: %{y:.1f}m<br><b>B: %{z:.2f} uT</b><extra></extra>"
@@ -123,25 +105,43 @@ def add_contours_fullrange(fig, z_data, x, y, row, col, zmin, zmax, show_cb=Fals
         hovertemplate=htemp
     ), row=row, col=col)
 
-# --- FENSTER 1: Schnitt mit Z-Slider (Frontansicht folgt der Leitungsrichtung) ---
-def calculate_front_slice(U, V, s_val):
-    # Ebene senkrecht zur lokalen Leitungsrichtung
-    if s_val <= 0:
-        t_dir = np.array([0.0, 0.0, 1.0])
-        origin = np.array([0.0, 0.0, s_val])
-        x_axis = np.array([1.0, 0.0, 0.0])
-    else:
-        t_dir = np.array([np.sin(alpha_rad), 0.0, np.cos(alpha_rad)])
-        origin = s_val * t_dir
-        x_axis = np.array([np.cos(alpha_rad), 0.0, -np.sin(alpha_rad)])
-
-    Xg = origin[0] + U * x_axis[0]
-    Yg = V
-    Zg = origin[2] + U * x_axis[2]
-    return calculate_field_with_bend(Xg, Yg, Zg)
+# --- Bei Bedarf: Schnitte in der Taipy-Oberfläche, berechnet wird nur der angezeigte Schnitt ---
+def make_slice_figure(x, y, title):
+    def make_figure(B, value):
+        fig = make_subplots(rows=1, cols=1, subplot_titles=[title.format(value)])
+        add_contours_custom(fig, B, x, y, 1, 1, show_cb=True)
+        return fig
+    return make_figure
+
+if LAZY_SLICES:
+    slice_server.run_slice_viewer({
+        "Schnitt s": (slice_server.SliceServer(slice_stack.get_front_slice_planes(s_slices, alpha_rad), X_side,
+                                               Y_side, paths, I_rms, f, r_wire=r_wire, mu_0=mu_0),
+                      s_slices, make_slice_figure(coords_side, y_coords_side, "Schnitt (s={:.0f} m)")),
+        "Draufsicht y": (slice_server.SliceServer(slice_stack.get_top_slice_planes(y_slices), X_top, Z_top,
+                                                  paths, I_rms, f, r_wire=r_wire, mu_0=mu_0),
+                         y_slices, make_slice_figure(coords_top, coords_top, "Draufsicht (y={:.0f} m)")),
+    }, title="NIS Kabel Knick")
+    raise SystemExit
 
-s_slices = np.arange(-L_plot / 2, L_plot / 2 + 1, 1)
-B_slices = [calculate_front_slice(X_side, Y_side, s_val) for s_val in s_slices]
+# --- FENSTER 1: Schnitt mit Z-Slider (Frontansicht folgt der Leitungsrichtung) ---
+# Ebenen senkrecht zur lokalen Leitungsrichtung, parallel über alle CPU-Kerne berechnet
+front_planes = slice_stack.get_front_slice_planes(s_slices, alpha_rad)
+B_slices = cache.cached("B_slices", (inputs, s_slices, alpha_rad, X_side, Y_side),
+                        lambda: slice_stack.build_slice_stack(front_planes, X_side, Y_side, paths, I_rms, f,
+                                                              r_wire=r_wire, mu_0=mu_0))
+
+# 1 µT-Abstand auf 1 m Höhe direkt über Strahlen ab der Leitungsachse (ohne Gitter), Frontschnitt vor dem Knick
+axis_x = float(np.mean([p['pos'][0] for p in phases]))
+d_left, d_right = isoline.get_compliance_distances(slice_stack.get_front_slice_planes([s_slices[0]], alpha_rad),
+                                                   paths, I_rms, f, axis_u=axis_x, height=1.0, r_wire=r_wire, mu_0=mu_0)
+print(f"1 µT-Abstand auf 1 m Höhe (s={s_slices[0]:.0f} m): links {d_left:.2f} m, rechts {d_right:.2f} m")
+
+# Orte mit empfindlicher Nutzung (OMEN) direkt als Punktliste (x, y, z) ohne Gitter
+omen = {'Fenster': (25.0, 4.0, -30.0), 'Balkon': (-20.0, 7.0, 15.0), 'Spielplatz': (40.0, 1.0, 60.0)}
+B_omen = biot_savart.calculate_field_points(np.array(list(omen.values())), paths, I_rms, f, r_wire=r_wire, mu_0=mu_0)
+for name, B in zip(omen, B_omen):
+    print(f"OMEN {name}: {B:.2f} µT")
 
 fig1 = make_subplots(rows=1, cols=1, subplot_titles=[f"Schnitt (s={s_slices[0]:.0f} m)"])
 add_contours_custom(fig1, B_slices[0], coords_side, y_coords_side, 1, 1, show_cb=True)
@@ -152,18 +152,21 @@ for p in phases:
                                marker=dict(color=p['color'], size=12), name=p['name']))
 
 frames = []
+marker_frames = []
 for s_val, b_data in zip(s_slices, B_slices):
     marker_updates = []
     for p in phases:
         px, py = p['pos']
         px_front = px if s_val <= 0 else px * np.cos(alpha_rad)
         marker_updates.append(go.Scatter(x=[px_front], y=[py]))
+    marker_frames.append(marker_updates)
 
-    frames.append(go.Frame(
-        name=f"s={s_val:.0f}",
-        data=[go.Contour(z=b_data), go.Contour(z=b_data), go.Contour(z=b_data), *marker_updates],
-        layout=go.Layout(title_text=f"Schnitt (s={s_val:.0f} m)")
-    ))
+    if not COMPACT_FRAMES:
+        frames.append(go.Frame(
+            name=f"s={s_val:.0f}",
+            data=[go.Contour(z=b_data), go.Contour(z=b_data), go.Contour(z=b_data), *marker_updates],
+            layout=go.Layout(title_text=f"Schnitt (s={s_val:.0f} m)")
+        ))
 
 fig1.frames = frames
 fig1.update_layout(
@@ -181,11 +184,13 @@ fig1.update_layout(
         ],
     }]
 )
-fig1.show()
+fig1.show(post_script=frame_payload.get_frames_script(
+    B_slices, [f"s={s_val:.0f}" for s_val in s_slices], titles=[f"Schnitt (s={s_val:.0f} m)" for s_val in s_slices],
+    extra_data=marker_frames) if COMPACT_FRAMES else None)
 
 # --- FENSTER 2: Draufsicht mit Y-Slider ---
-y_slices = np.arange(0, int(y_coords_side.max()) + 1, 1)
-B_top_slices = [calculate_field_with_bend(X_top, y_val, Z_top) for y_val in y_slices]
+B_top_slices = cache.cached("B_top_slices", (inputs, y_slices, X_top, Z_top), lambda: slice_stack.build_slice_stack(
+    slice_stack.get_top_slice_planes(y_slices), X_top, Z_top, paths, I_rms, f, r_wire=r_wire, mu_0=mu_0))
 
 fig2 = make_subplots(rows=1, cols=1, subplot_titles=[f"Draufsicht (y={y_slices[0]:.0f} m)"])
 add_contours_custom(fig2, B_top_slices[0], coords_top, coords_top, 1, 1, show_cb=True)
@@ -198,12 +203,13 @@ for p in phases:
 
 frames2 = []
 for y_val, b_data in zip(y_slices, B_top_slices):
-    frames2.append(go.Frame(
-        name=f"y={y_val:.0f}",
-        data=[go.Contour(z=b_data), go.Contour(z=b_data), go.Contour(z=b_data)],
-        traces=[0, 1, 2],
-        layout=go.Layout(title_text=f"Draufsicht (y={y_val:.0f} m)")
-    ))
+    if not COMPACT_FRAMES:
+        frames2.append(go.Frame(
+            name=f"y={y_val:.0f}",
+            data=[go.Contour(z=b_data), go.Contour(z=b_data), go.Contour(z=b_data)],
+            traces=[0, 1, 2],
+            layout=go.Layout(title_text=f"Draufsicht (y={y_val:.0f} m)")
+        ))
 
 fig2.frames = frames2
 fig2.update_layout(
@@ -221,14 +227,18 @@ fig2.update_layout(
         ],
     }]
 )
-fig2.show()
+fig2.show(post_script=frame_payload.get_frames_script(
+    B_top_slices, [f"y={y_val:.0f}" for y_val in y_slices],
+    titles=[f"Draufsicht (y={y_val:.0f} m)" for y_val in y_slices]) if COMPACT_FRAMES else None)
 
 # --- FENSTER 3: 3D Plot (Korrekt nach oben!) ---
-res3d = 30
+# Volumen als Memory-Map in eigenem Verzeichnis, blockweise gefüllt; der Plot erhält jeden step-ten Punkt je Achse
+res3d, step3d = 61, 2  # (res3d - 1) durch step3d teilbar, damit die Ränder erhalten bleiben
 c3d = np.linspace(-L_plot/2, L_plot/2, res3d)
 y3d = np.linspace(0, 50, res3d) # Höhe
-X3, Y3, Z3 = np.meshgrid(c3d, y3d, c3d)
-B3D = calculate_field_with_bend(X3, Y3, Z3)
+volume_path = volume_store.get_volume_path(result_cache.fingerprint_inputs('B3D', inputs, c3d, y3d))
+volume = volume_store.FieldVolume.get_or_fill(volume_path, c3d, y3d, c3d, paths, I_rms, f, r_wire=r_wire, mu_0=mu_0)
+X3, Y3, Z3, B3D = volume.get_isosurface_data(step=step3d)
 
 fig3 = go.Figure()
 
@@ -276,21 +286,13 @@ def meters_to_latlon(x_m, y_m, lat0, lon0):
     lon = lon0 + (x_m / meters_per_deg_lon)
     return lat, lon
 
-# Konturlinien fuer Mapbox: mit matplotlib erzeugen, in Plotly als Scattermapbox zeichnen
+# Konturlinien fuer Mapbox: mit Marching Squares direkt aus dem Gitter, in Plotly als Scattermapbox zeichnen
 def build_mapbox_contours(lat_grid, lon_grid, z_grid, levels, colorscale):
-    try:
-        import matplotlib
-        matplotlib.use("Agg")
-        import matplotlib.pyplot as plt
-    except Exception as exc:
-        raise RuntimeError("matplotlib wird zum Berechnen der Konturlinien benoetigt.") from exc
-
-    fig = plt.figure()
-    cs = plt.contour(lon_grid, lat_grid, z_grid, levels=levels)
     traces = []
     level_min = min(levels)
     level_max = max(levels)
-    for lvl, segs in zip(cs.levels, cs.allsegs):
+    for line in marching_squares.extract_contours(lon_grid, lat_grid, z_grid, levels):
+        lvl = line.level
         if np.isclose(lvl, 0.9):
             color = "black"
             width = 2
@@ -298,19 +300,13 @@ def build_mapbox_contours(lat_grid, lon_grid, z_grid, levels, colorscale):
             t = 0.0 if level_max == level_min else (lvl - level_min) / (level_max - level_min)
             color = sample_colorscale(colorscale, t)[0]
             width = 1.5 if lvl >= 10 else 1
-        for seg in segs:
-            if seg.shape[0] < 2:
-                continue
-            lon = seg[:, 0]
-            lat = seg[:, 1]
-            traces.append(go.Scattermapbox(
-                lat=lat,
-                lon=lon,
-                mode="lines",
-                line=dict(color=color, width=width),
-                showlegend=False
-            ))
-    plt.close(fig)
+        traces.append(go.Scattermapbox(
+            lat=line.points[:, 1],
+            lon=line.points[:, 0],
+            mode="lines",
+            line=dict(color=color, width=width),
+            showlegend=False
+        ))
     return traces
 
 # Fester Punkt in Nordost-Schweiz (freies Feld, ungefaehr)
@@ -328,7 +324,7 @@ B_map = B_top_slices[idx_map]
 
 # Grid in Lat/Lon umrechnen (X -> Ost/West, Z -> Nord/Sued)
 lat_grid, lon_grid = meters_to_latlon(X_top, Z_top, base_lat, base_lon)
-levels = [0.9] + list(np.arange(1, 11, 1)) + list(np.arange(20, 201, 10))
+levels = biot_savart.CONTOUR_LEVELS
 
 fig_map = go.Figure()
 fig_map.add_trace(go.Densitymapbox(
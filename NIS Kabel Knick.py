@@ -3,13 +3,15 @@ import plotly.graph_objs as go
 from plotly.subplots import make_subplots
 import plotly.io as pio
 
+from src.utils import biot_savart
+
 pio.renderers.default = 'browser'
 
 # --- 1. Parameter ---
 I_rms = 1000.0
 f = 50.0
 mu_0 = 4 * np.pi * 1e-7
-L_calc = 2000000.0
+L_calc = None  # None: Zuleitungen exakt halbunendlich statt 2000 km Rechenlänge
 L_plot = 100.0
 r_wire = 0.01
 alpha_deg = 45.0
@@ -19,43 +21,10 @@ C_SCALE = 'Viridis'
 
 phases = [{'pos':(-6.0, 20.0), 'shift':0}, {'pos':(0.0, 25.0), 'shift':2 * np.pi / 3}, {'pos':(6.0, 20.0), 'shift':4 * np.pi / 3}]
 
-def get_b_vector_segment_vectorized(P_x, P_y, P_z, start, end, I_t):
-    L_vec = end - start
-    L_mag = np.linalg.norm(L_vec)
-    unit_L = L_vec / L_mag
-    dx, dy, dz = P_x - start[0], P_y - start[1], P_z - start[2]
-    d = dx * unit_L[0] + dy * unit_L[1] + dz * unit_L[2]
-    r_perp_x, r_perp_y, r_perp_z = dx - d * unit_L[0], dy - d * unit_L[1], dz - d * unit_L[2]
-    r_mag_raw = np.sqrt(r_perp_x**2 + r_perp_y**2 + r_perp_z**2)
-    r_mag = np.maximum(r_mag_raw, r_wire)
-    cos_theta1 = d / np.sqrt(d**2 + r_mag**2)
-    cos_theta2 = (L_mag - d) / np.sqrt((L_mag - d)**2 + r_mag**2)
-    B_mag = (mu_0 * I_t) / (4 * np.pi * r_mag) * (cos_theta1 + cos_theta2)
-    B_mag *= np.where(r_mag_raw < r_wire, r_mag_raw / r_wire, 1.0)
-    Bx_dir = unit_L[1] * r_perp_z - unit_L[2] * r_perp_y
-    By_dir = unit_L[2] * r_perp_x - unit_L[0] * r_perp_z
-    Bz_dir = unit_L[0] * r_perp_y - unit_L[1] * r_perp_x
-    dir_norm = np.maximum(np.sqrt(Bx_dir**2 + By_dir**2 + Bz_dir**2), 1e-12)
-    return B_mag * (Bx_dir / dir_norm), B_mag * (By_dir / dir_norm), B_mag * (Bz_dir / dir_norm)
-
-def calculate_field_with_bend(X, Y, Z):
-    t_steps = np.linspace(0, 1 / f, 12)
-    B_total_sq_sum = np.zeros_like(X)
-    Y_grid = np.full_like(X, Y) if np.isscalar(Y) else Y
-    Z_grid = np.full_like(X, Z) if np.isscalar(Z) else Z
-    for t in t_steps:
-        Bx_sum, By_sum, Bz_sum = np.zeros_like(X), np.zeros_like(X), np.zeros_like(X)
-        for p in phases:
-            I_t = I_rms * np.sqrt(2) * np.sin(2 * np.pi * f * t + p['shift'])
-            px, py = p['pos']
-            s1_start, s1_end = np.array([px, py, -L_calc / 2]), np.array([px, py, 0])
-            B1x, B1y, B1z = get_b_vector_segment_vectorized(X, Y_grid, Z_grid, s1_start, s1_end, I_t)
-            dir_vec = np.array([np.sin(alpha_rad), 0, np.cos(alpha_rad)])
-            s2_start, s2_end = s1_end, s1_end + (L_calc / 2) * dir_vec
-            B2x, B2y, B2z = get_b_vector_segment_vectorized(X, Y_grid, Z_grid, s2_start, s2_end, I_t)
-            Bx_sum += (B1x + B2x); By_sum += (B1y + B2y); Bz_sum += (B1z + B2z)
-        B_total_sq_sum += (Bx_sum**2 + By_sum**2 + Bz_sum**2)
-    return np.sqrt(B_total_sq_sum / len(t_steps)) * 1e6
+# Feldberechnung: Phasor-Modus (exakter Effektivwert), mode="time_steps" rechnet die 12 Zeitschritte als Referenz
+def calculate_field_with_bend(X, Y, Z, mode="phasor"):
+    return biot_savart.calculate_field_with_bend(X, Y, Z, phases, I_rms, f, alpha_rad, L_calc=L_calc,
+                                                 r_wire=r_wire, mu_0=mu_0, mode=mode)
 
 # --- 2. Daten berechnen ---
 res = 80
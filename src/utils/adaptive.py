@@ -0,0 +1,155 @@
+import itertools
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.utils import biot_savart
+from src.utils.conductors import ConductorPath
+from src.utils.slice_stack import PlaneStack
+
+# Verhältnis max/min der Eckwerte, ab dem eine Zelle auch ohne Isolinie verfeinert wird (Leiternähe)
+DEFAULT_MAX_RATIO = 2.0
+
+
+@dataclass
+class AdaptiveResult:
+    """
+    Ergebnis der adaptiven Verfeinerung auf dem feinsten Gitter.
+
+    Attributes:
+        axes: Koordinaten des feinsten Gitters je Parameterachse
+        values: B in µT auf dem feinsten Gitter, nicht berechnete Punkte multilinear interpoliert
+        evaluated: Maske der exakt berechneten Gitterpunkte (verfeinertes Netz)
+        n_evaluations: Anzahl Feldauswertungen
+    """
+    axes: list[np.ndarray]
+    values: np.ndarray
+    evaluated: np.ndarray
+    n_evaluations: int
+
+    def get_mesh_points(self) -> tuple[np.ndarray, np.ndarray]:
+        # Verfeinertes Netz: Parameterkoordinaten der berechneten Punkte und ihre Werte
+        idx = np.nonzero(self.evaluated)
+        return np.stack([axis[i] for axis, i in zip(self.axes, idx)], axis=1), self.values[idx]
+
+
+def _get_cell_corner_extrema(values: np.ndarray, stride: int) -> tuple[np.ndarray, np.ndarray]:
+    # Minimum und Maximum der 2^D Eckwerte aller Zellen der Kantenlänge stride
+    coarse = values[tuple(slice(None, None, stride) for _ in range(values.ndim))]
+    corners = [coarse[tuple(slice(o, coarse.shape[a] - 1 + o) for a, o in enumerate(offset))]
+               for offset in itertools.product((0, 1), repeat=values.ndim)]
+    return np.minimum.reduce(corners), np.maximum.reduce(corners)
+
+
+def _fill_by_interpolation(values: np.ndarray, stride: int) -> None:
+    # Füllt die noch leeren Punkte auf Raster stride/2 multilinear aus dem Raster stride (Achse für Achse)
+    half = stride // 2
+    for axis in range(values.ndim):
+        index = [slice(None, None, half if a < axis else stride) for a in range(values.ndim)]
+        index[axis] = slice(half, None, stride)
+        lower, upper = list(index), list(index)
+        lower[axis] = slice(0, -half, stride)
+        upper[axis] = slice(stride, None, stride)
+        target = values[tuple(index)]
+        interpolated = 0.5 * (values[tuple(lower)] + values[tuple(upper)])
+        np.copyto(target, interpolated, where=np.isnan(target))
+
+
+def refine_adaptive(field_fn: Callable[[np.ndarray], np.ndarray], ranges: list[tuple[float, float]],
+                    n_coarse: int = 8, max_level: int = 4, levels: list[float] | None = None,
+                    max_ratio: float = DEFAULT_MAX_RATIO) -> AdaptiveResult:
+    """
+    Adaptive Quadtree- (2D) bzw. Octree-Verfeinerung (3D) um die Isolinien.
+    Start auf einem groben Gitter; verfeinert werden nur Zellen, in denen B eine der Isolinien schneidet
+    oder sich stark ändert (max/min der Eckwerte > max_ratio). Jede Stufe wird in einem Aufruf von
+    field_fn ausgewertet.
+
+    Args:
+        field_fn: Funktion Parameterpunkte (N, D) -> B in µT (N,)
+        ranges: Wertebereich je Parameterachse
+        n_coarse: Zellen je Achse auf der gröbsten Stufe
+        max_level: Anzahl Verfeinerungsstufen (Zellgrösse halbiert sich je Stufe)
+        levels: Isolinien in µT, Standard sind die Isolinien der Auswertung
+        max_ratio: Verhältnis der Eckwerte für die Verfeinerung ohne Isolinie, None schaltet das Kriterium ab
+
+    Returns:
+        AdaptiveResult auf dem Gitter mit n_coarse * 2^max_level Zellen je Achse
+    """
+    levels = np.sort(np.asarray(biot_savart.CONTOUR_LEVELS if levels is None else levels, dtype=float))
+    n_dim = len(ranges)
+    stride = 2**max_level
+    n_fine = n_coarse * stride + 1
+    axes = [np.linspace(lo, hi, n_fine) for lo, hi in ranges]
+    values = np.full((n_fine,) * n_dim, np.nan)
+    n_evaluations = 0
+
+    def evaluate(indices: np.ndarray) -> None:
+        nonlocal n_evaluations
+        indices = indices[np.isnan(values[tuple(indices.T)])]
+        if len(indices):
+            params = np.stack([axis[i] for axis, i in zip(axes, indices.T)], axis=1)
+            values[tuple(indices.T)] = field_fn(params)
+            n_evaluations += len(indices)
+
+    # Gröbste Stufe vollständig
+    coarse = np.arange(0, n_fine, stride)
+    evaluate(np.stack(np.meshgrid(*([coarse] * n_dim), indexing='ij'), axis=-1).reshape(-1, n_dim))
+
+    active = np.ones((n_coarse,) * n_dim, dtype=bool)
+    for _ in range(max_level):
+        c_min, c_max = _get_cell_corner_extrema(values, stride)
+        # Zelle schneidet eine Isolinie, wenn zwischen min und max ein Level liegt
+        crossing = np.searchsorted(levels, c_min, side='left') != np.searchsorted(levels, c_max, side='left')
+        marked = active & crossing
+        if max_ratio is not None:
+            marked |= active & (c_max > max_ratio * np.maximum(c_min, 1e-12)) & (c_max >= levels[0])
+        if not marked.any():
+            break
+
+        # Alle Punkte auf Raster stride/2 innerhalb der markierten Zellen auswerten
+        half = stride // 2
+        cells = np.argwhere(marked)
+        offsets = np.array(list(itertools.product((0, 1, 2), repeat=n_dim)))
+        evaluate(np.unique((cells[:, None, :] * 2 + offsets[None, :, :]).reshape(-1, n_dim) * half, axis=0))
+
+        active = marked
+        for axis in range(n_dim):
+            active = np.repeat(active, 2, axis=axis)
+        stride = half
+
+    # Regelmässiges Gitter: nicht berechnete Punkte von grob nach fein interpolieren
+    evaluated = ~np.isnan(values)
+    fill_stride = 2**max_level
+    while fill_stride > 1:
+        _fill_by_interpolation(values, fill_stride)
+        fill_stride //= 2
+    return AdaptiveResult(axes, values, evaluated, n_evaluations)
+
+
+def refine_plane(plane: PlaneStack, u_range: tuple[float, float], v_range: tuple[float, float],
+                 paths: list[ConductorPath], I_rms: float, f: float, r_wire: float = biot_savart.R_WIRE,
+                 mu_0: float = biot_savart.MU_0, n_coarse: int = 8, max_level: int = 4,
+                 levels: list[float] | None = None, max_ratio: float = DEFAULT_MAX_RATIO) -> AdaptiveResult:
+    """
+    Adaptive Auswertung einer Schnittebene (Draufsicht oder Frontschnitt), z.B. aus get_top_slice_planes.
+    Die Werte sind als values[u, v] indiziert.
+    """
+    origin, u_axis, v_axis = plane.origins[0], plane.u_axes[0], plane.v_axes[0]
+
+    def field_fn(params: np.ndarray) -> np.ndarray:
+        points = origin + params[:, :1] * u_axis + params[:, 1:] * v_axis
+        return biot_savart.calculate_rms_chunked(points, paths, I_rms, f, r_wire, mu_0) * 1e6
+
+    return refine_adaptive(field_fn, [u_range, v_range], n_coarse, max_level, levels, max_ratio)
+
+
+def refine_volume(x_range: tuple[float, float], y_range: tuple[float, float], z_range: tuple[float, float],
+                  paths: list[ConductorPath], I_rms: float, f: float, r_wire: float = biot_savart.R_WIRE,
+                  mu_0: float = biot_savart.MU_0, n_coarse: int = 8, max_level: int = 3,
+                  levels: list[float] | None = None, max_ratio: float = DEFAULT_MAX_RATIO) -> AdaptiveResult:
+    # Adaptive Octree-Auswertung eines Quaders, die Werte sind als values[x, y, z] indiziert
+    def field_fn(params: np.ndarray) -> np.ndarray:
+        return biot_savart.calculate_rms_chunked(params, paths, I_rms, f, r_wire, mu_0) * 1e6
+
+    return refine_adaptive(field_fn, [x_range, y_range, z_range], n_coarse, max_level, levels, max_ratio)
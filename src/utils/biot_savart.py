@@ -0,0 +1,451 @@
+import warnings
+from typing import Any
+
+import numpy as np
+
+from src.utils.conductors import ConductorSet, Conductors, SegmentSet, get_segment_set, get_shifts
+from src.utils.kernel_cache import KernelCache, fingerprint_arrays
+
+# Physikalische Konstanten und Standardwerte der Skripte
+MU_0 = 4 * np.pi * 1e-7
+R_WIRE = 0.01
+
+# Version der Feldberechnung; bei jeder Änderung der Ergebnisse erhöhen, damit gespeicherte Resultate verfallen
+KERNEL_VERSION = 1
+
+# Anzahl Zeitschritte für den Referenzmodus (wie bisher in den Skripten)
+N_TIME_STEPS = 12
+
+FIELD_MODES = ("phasor", "time_steps")
+
+# Isolinien der Auswertung in µT: 0.9 µT Hilfslinie, 1-10 µT in 1er- und 20-200 µT in 10er-Schritten
+CONTOUR_LEVELS = [0.9] + list(range(1, 11)) + list(range(20, 201, 10))
+
+# Standardbudget der blockweisen Auswertung in Bytes (Blöcke in Cache-Grösse sind am schnellsten)
+DEFAULT_MAX_MEMORY = 8 * 1024**2
+
+# Genauigkeitsprüfung des float32-Modus gegen eine float64-Stichprobe: |B32 - B64| <= rtol * B64 + atol
+FLOAT32_CHECK_POINTS = 256
+FLOAT32_RTOL = 1e-4
+FLOAT32_ATOL = 1e-9  # 0.001 µT
+
+
+def get_phase_current_phasor(I_rms: float | np.ndarray, shift: float | np.ndarray) -> complex | np.ndarray:
+    # Komplexer Scheitelwert-Zeiger zu i(t) = I_rms * sqrt(2) * sin(wt + shift)
+    return I_rms * np.sqrt(2) * np.exp(1j * shift)
+
+
+def calculate_rms_from_phasor(Bx: np.ndarray, By: np.ndarray, Bz: np.ndarray) -> np.ndarray:
+    # Exakter Effektivwert des Feldvektors aus den Scheitelwert-Zeigern
+    return np.sqrt(np.abs(Bx)**2 + np.abs(By)**2 + np.abs(Bz)**2) / np.sqrt(2)
+
+
+class KernelScratch:
+    """
+    Vorab allozierte Zwischenspeicher des Segment-Kernels für Blöcke bis chunk_size Punkte.
+    Alle Rechenschritte schreiben über out= in diese Puffer, der Speicherbedarf hängt nur von
+    chunk_size und der Segmentanzahl ab, nicht von der Gittergrösse.
+    """
+    N_BUFFERS = 7
+
+    def __init__(self, n_segments: int, chunk_size: int, dtype: type = np.float64) -> None:
+        self.chunk_size: int = chunk_size
+        self.dtype: np.dtype = np.dtype(dtype)
+        self._buffers: np.ndarray = np.empty((self.N_BUFFERS, n_segments, chunk_size), dtype=dtype)
+        self.fields: np.ndarray = np.empty((n_segments, 3, chunk_size), dtype=dtype)
+
+    def get_buffers(self, n_points: int) -> list[np.ndarray]:
+        return [buffer[:, :n_points] for buffer in self._buffers]
+
+    @classmethod
+    def get_bytes_per_point(cls, n_segments: int, itemsize: int = 8) -> int:
+        # Puffer plus Feldvektoren je Segment
+        return (cls.N_BUFFERS + 3) * n_segments * itemsize
+
+
+def _add_cos_theta(d: np.ndarray, r_sq: np.ndarray, infinite: np.ndarray | None, tmp: np.ndarray,
+                   out: np.ndarray) -> None:
+    # out += d / sqrt(d² + r²); Enden im Unendlichen tragen exakt 1 bei und werden nicht berechnet
+    finite = True if infinite is None else ~infinite[:, None]
+    np.multiply(d, d, out=tmp, where=finite)
+    np.add(tmp, r_sq, out=tmp, where=finite)
+    np.sqrt(tmp, out=tmp, where=finite)
+    np.divide(d, tmp, out=tmp, where=finite)
+    if infinite is not None:
+        tmp[infinite] = 1.0
+    out += tmp
+
+
+def _unit_b_vectors_into(points: np.ndarray, anchors: np.ndarray, unit_L: np.ndarray, d_start: np.ndarray,
+                         d_end: np.ndarray, start_infinite: np.ndarray | None, end_infinite: np.ndarray | None,
+                         r_wire: float, mu_0: float, scratch: KernelScratch) -> np.ndarray:
+    # Segment-Kernel auf den Puffern von scratch: B = mu_0/(4*pi) * (cos1 + cos2) * (u x r_perp) / r_mag²
+    # Die Projektion d wird ab einem Ankerpunkt auf der Segmentachse gemessen, der Start liegt bei
+    # d = -d_start, das Ende bei d = d_end.
+    n = len(points)
+    rx, ry, rz, d, r_sq, tmp, coef = scratch.get_buffers(n)
+    fields = scratch.fields[:, :, :n]
+    ux, uy, uz = (unit_L[:, k, None] for k in range(3))
+
+    # Abstand zum Ankerpunkt und Projektion auf die Segmentachse
+    for k, r in enumerate((rx, ry, rz)):
+        np.subtract(points[None, :, k], anchors[:, k, None], out=r)
+    np.multiply(rx, ux, out=d)
+    d += np.multiply(ry, uy, out=tmp)
+    d += np.multiply(rz, uz, out=tmp)
+
+    # Senkrechter Anteil r_perp und r_mag² mit Begrenzung auf den Leiterradius
+    for r, u in ((rx, ux), (ry, uy), (rz, uz)):
+        r -= np.multiply(d, u, out=tmp)
+    np.multiply(rx, rx, out=r_sq)
+    r_sq += np.multiply(ry, ry, out=tmp)
+    r_sq += np.multiply(rz, rz, out=tmp)
+    np.maximum(r_sq, r_wire**2, out=r_sq)
+
+    # Richtung u x r_perp, |u x r_perp| = |r_perp|; im Leiter fällt das Feld dadurch linear auf 0 ab
+    for k, (a1, r1, a2, r2) in enumerate(((uy, rz, uz, ry), (uz, rx, ux, rz), (ux, ry, uy, rx))):
+        component = fields[:, k]
+        np.multiply(a1, r1, out=component)
+        component -= np.multiply(a2, r2, out=tmp)
+
+    # cos-Terme beider Segmentenden, rx dient ab hier als Puffer für den Abstand zum jeweiligen Ende
+    coef.fill(0.0)
+    _add_cos_theta(np.add(d, d_start[:, None], out=rx), r_sq, start_infinite, tmp, coef)
+    _add_cos_theta(np.subtract(d_end[:, None], d, out=rx), r_sq, end_infinite, tmp, coef)
+    coef /= r_sq
+    coef *= mu_0 / (4 * np.pi)
+    for k in range(3):
+        fields[:, k] *= coef
+    return fields
+
+
+def get_unit_b_vectors_batched(points: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                               start_infinite: np.ndarray | None = None, end_infinite: np.ndarray | None = None,
+                               r_wire: float = R_WIRE, mu_0: float = MU_0, scratch: KernelScratch | None = None,
+                               dtype: type = np.float64) -> np.ndarray:
+    """
+    Einheitsstrom-Felder (I = 1 A) vieler gerader Segmente in einem Broadcast über (Segmente × Punkte).
+    Für halbunendliche Segmente wird der cos-Term am offenen Ende nicht berechnet, sondern exakt 1 gesetzt.
+    Die Geometrie wird in float64 um die Aufpunkte zentriert (Ankerpunkte = Lotfusspunkte auf den
+    Segmentachsen), erst danach wird in den Rechen-Datentyp umgewandelt. So bleibt auch float32 genau.
+
+    Args:
+        points: Aufpunkte der Form (P, 3) [m]
+        starts: Segment-Startpunkte der Form (S, 3) [m]
+        ends: Segment-Endpunkte der Form (S, 3) [m]
+        start_infinite: Optional, Segment beginnt im Unendlichen, Form (S,)
+        end_infinite: Optional, Segment endet im Unendlichen, Form (S,)
+        r_wire: Leiterradius [m]
+        mu_0: Magnetische Feldkonstante [Vs/Am]
+        scratch: Optionale Puffer für mindestens P Punkte; das Ergebnis ist dann eine Ansicht darauf
+            und wird beim nächsten Aufruf überschrieben
+        dtype: Rechen-Datentyp ohne scratch (np.float64 oder np.float32), sonst der von scratch
+
+    Returns:
+        Array der Form (S, 3, P) in T/A
+    """
+    if scratch is None:
+        scratch = KernelScratch(len(starts), len(points), dtype)
+    dtype = scratch.dtype
+    L_vec = ends - starts
+    L_mag = np.linalg.norm(L_vec, axis=1)
+    unit_L = L_vec / L_mag[:, None]
+
+    # Zentrierung: Ursprung in die Mitte der Aufpunkte, Anker auf das Lot vom Ursprung auf die Segmentachse
+    center = 0.5 * (points.min(axis=0) + points.max(axis=0))
+    starts_c = starts - center
+    t = np.einsum('sk,sk->s', starts_c, unit_L)
+    anchors = starts_c - t[:, None] * unit_L
+    return _unit_b_vectors_into((points - center).astype(dtype, copy=False), anchors.astype(dtype),
+                                unit_L.astype(dtype), (-t).astype(dtype), (L_mag + t).astype(dtype),
+                                start_infinite, end_infinite, r_wire, mu_0, scratch)
+
+
+def get_chunk_size(n_segments: int, n_conductors: int, max_memory: int, itemsize: int = 8) -> int:
+    # Punkte je Block, sodass Kernel-Puffer und Feldsummen in max_memory Bytes passen
+    bytes_per_point = KernelScratch.get_bytes_per_point(n_segments, itemsize) + (3 * n_conductors + 16) * itemsize
+    return max(1, int(max_memory // bytes_per_point))
+
+
+def get_segment_unit_fields(points: np.ndarray, segments: SegmentSet, r_wire: float = R_WIRE, mu_0: float = MU_0,
+                            cache: KernelCache | None = None) -> np.ndarray:
+    """
+    Einheitsstrom-Felder aller Segmente, Form (S, 3, P). Mit Cache werden nur die
+    noch unbekannten (Gitter, Segment)-Paare berechnet, und zwar gemeinsam in einem Broadcast.
+    """
+    starts, ends = segments.starts, segments.ends
+    start_inf, end_inf = segments.start_infinite, segments.end_infinite
+    if cache is None:
+        return get_unit_b_vectors_batched(points, starts, ends, start_inf, end_inf, r_wire, mu_0)
+
+    grid_key = fingerprint_arrays(points)
+    keys = [(grid_key, fingerprint_arrays(starts[i], ends[i], start_inf[i], end_inf[i], r_wire, mu_0))
+            for i in range(len(segments))]
+    fields = np.empty((len(segments), 3, len(points)))
+    missing = []
+    for i, key in enumerate(keys):
+        entry = cache.lookup(key)
+        if entry is None:
+            missing.append(i)
+        else:
+            fields[i] = entry
+    if missing:
+        fields[missing] = get_unit_b_vectors_batched(points, starts[missing], ends[missing], start_inf[missing],
+                                                     end_inf[missing], r_wire, mu_0)
+        for i in missing:
+            cache.put(keys[i], fields[i].copy())
+    return fields
+
+
+def get_path_unit_fields(points: np.ndarray, paths: Conductors, r_wire: float = R_WIRE,
+                         mu_0: float = MU_0, cache: KernelCache | None = None) -> np.ndarray:
+    """
+    Einheitsstrom-Felder aller Leiterverläufe (Summe ihrer Segmente für I = 1 A).
+
+    Args:
+        points: Aufpunkte der Form (P, 3) [m]
+        paths: Leiterverläufe als Polylinien oder Leitertabelle (ConductorSet)
+        r_wire: Leiterradius [m]
+        mu_0: Magnetische Feldkonstante [Vs/Am]
+        cache: Optionaler KernelCache
+
+    Returns:
+        Array der Form (Anzahl Leiter, 3, P) in T/A
+    """
+    segments = get_segment_set(paths)
+    segment_fields = get_segment_unit_fields(points, segments, r_wire, mu_0, cache)
+    return np.add.reduceat(segment_fields, segments.offsets, axis=0)
+
+
+def combine_unit_fields(unit_fields: np.ndarray, currents: np.ndarray) -> np.ndarray:
+    """
+    Überlagert die Einheitsstrom-Felder linear mit den Leiterströmen (Matrixprodukt).
+
+    Args:
+        unit_fields: Array der Form (Anzahl Leiter, 3, ...)
+        currents: Ströme bzw. Zeiger der Form (..., Anzahl Leiter), z.B. (Szenarien, Leiter)
+
+    Returns:
+        Feldvektoren der Form (..., 3, ...)
+    """
+    currents = np.asarray(currents)
+    return np.tensordot(currents, unit_fields, axes=([-1], [0]))
+
+
+def get_points(X: np.ndarray, Y: Any, Z: Any) -> tuple[np.ndarray, tuple[int, ...]]:
+    # Gitter bzw. Skalare zu einer Punktliste (P, 3) zusammenfassen
+    X_b, Y_b, Z_b = np.broadcast_arrays(X, Y, Z)
+    return np.stack([X_b.ravel(), Y_b.ravel(), Z_b.ravel()], axis=1).astype(float), X_b.shape
+
+
+def calculate_rms_from_unit_fields(unit_fields: np.ndarray, shifts: np.ndarray, I_rms: float | np.ndarray, f: float,
+                                   mode: str = "phasor") -> np.ndarray:
+    """
+    Effektivwert von B in T aus den Einheitsstrom-Feldern der Leiter.
+
+    Args:
+        unit_fields: Array der Form (Anzahl Leiter, 3, ...)
+        shifts: Phasenlagen der Leiterströme [rad]
+        I_rms: Effektivwert des Leiterstroms [A], Skalar oder je Leiter (C,)
+        f: Frequenz [Hz]
+        mode: "phasor" (exakt) oder "time_steps" (12 Zeitschritte als Referenz)
+
+    Returns:
+        Effektivwert von B im Datentyp der Einheitsstrom-Felder
+    """
+    if mode not in FIELD_MODES:
+        raise ValueError(f"Unbekannter Berechnungsmodus '{mode}', erlaubt sind: {', '.join(FIELD_MODES)}")
+
+    if mode == "phasor":
+        # Jeder Leiter wird pro Punkt genau einmal mit seinem komplexen Stromzeiger gewichtet
+        I_hat = get_phase_current_phasor(I_rms, np.asarray(shifts)).astype(np.result_type(unit_fields, np.complex64))
+        Bx, By, Bz = combine_unit_fields(unit_fields, I_hat)
+        return calculate_rms_from_phasor(Bx, By, Bz)
+
+    # Referenzmodus: Momentanwerte über eine Periode abtasten und |B|² mitteln
+    t_steps = np.linspace(0, 1 / f, N_TIME_STEPS)
+    B_total_sq_sum = np.zeros(unit_fields.shape[2:], dtype=unit_fields.dtype)
+    for t in t_steps:
+        I_t = (I_rms * np.sqrt(2) * np.sin(2 * np.pi * f * t + np.asarray(shifts))).astype(unit_fields.dtype)
+        Bx_sum, By_sum, Bz_sum = combine_unit_fields(unit_fields, I_t)
+        B_total_sq_sum += (Bx_sum**2 + By_sum**2 + Bz_sum**2)
+    return np.sqrt(B_total_sq_sum / len(t_steps))
+
+
+def calculate_rms_chunked(points: np.ndarray, paths: Conductors, I_rms: float | np.ndarray, f: float,
+                          r_wire: float = R_WIRE, mu_0: float = MU_0, mode: str = "phasor",
+                          max_memory: int = DEFAULT_MAX_MEMORY, dtype: type = np.float64) -> np.ndarray:
+    """
+    Effektivwert von B in T, blockweise über die Punktliste berechnet. Die Kernel-Puffer werden einmal
+    alloziert und für jeden Block wiederverwendet, die Ergebnisse direkt in ein Ausgabe-Array geschrieben.
+    Mit dtype=np.float32 halbiert sich der Speicherverkehr; das Ergebnis wird an einer float64-Stichprobe
+    geprüft und bei Überschreitung der Toleranz mit Warnung in float64 neu berechnet.
+
+    Args:
+        points: Aufpunkte der Form (P, 3) [m]
+        paths: Leiterverläufe mit Phasenlage 'shift' oder Leitertabelle (ConductorSet)
+        I_rms: Effektivwert des Leiterstroms [A], Skalar oder je Leiter (C,)
+        f: Frequenz [Hz]
+        r_wire: Leiterradius [m]
+        mu_0: Magnetische Feldkonstante [Vs/Am]
+        mode: "phasor" (exakt) oder "time_steps" (12 Zeitschritte als Referenz)
+        max_memory: Speicherbudget der Zwischenergebnisse in Bytes (unabhängig von P)
+        dtype: Rechen-Datentyp, np.float64 oder np.float32
+
+    Returns:
+        Effektivwert von B der Form (P,) in T
+    """
+    segments = get_segment_set(paths)
+    shifts = get_shifts(paths)
+    itemsize = np.dtype(dtype).itemsize
+    chunk_size = min(len(points), get_chunk_size(len(segments), len(paths), max_memory, itemsize))
+    scratch = KernelScratch(len(segments), chunk_size, dtype)
+    path_fields = np.empty((len(paths), 3, chunk_size), dtype=dtype)
+    B_rms = np.empty(len(points), dtype=dtype)
+    for i0 in range(0, len(points), chunk_size):
+        block = points[i0:i0 + chunk_size]
+        n = len(block)
+        segment_fields = get_unit_b_vectors_batched(block, segments.starts, segments.ends, segments.start_infinite,
+                                                    segments.end_infinite, r_wire, mu_0, scratch)
+        np.add.reduceat(segment_fields, segments.offsets, axis=0, out=path_fields[:, :, :n])
+        B_rms[i0:i0 + n] = calculate_rms_from_unit_fields(path_fields[:, :, :n], shifts, I_rms, f, mode)
+
+    if np.dtype(dtype) != np.float64:
+        max_error = check_float32_accuracy(points, B_rms, paths, I_rms, f, r_wire, mu_0, mode)
+        if max_error > 1.0:
+            warnings.warn(f"float32-Ergebnis ausserhalb der Toleranz ({max_error:.1f}-fache erlaubte Abweichung), "
+                          f"Neuberechnung in float64", RuntimeWarning, stacklevel=2)
+            return calculate_rms_chunked(points, paths, I_rms, f, r_wire, mu_0, mode, max_memory)
+    return B_rms
+
+
+def check_float32_accuracy(points: np.ndarray, B_rms: np.ndarray, paths: Conductors, I_rms: float | np.ndarray,
+                           f: float, r_wire: float = R_WIRE, mu_0: float = MU_0, mode: str = "phasor",
+                           n_samples: int = FLOAT32_CHECK_POINTS) -> float:
+    """
+    Vergleicht ein float32-Ergebnis an einer gleichmässig verteilten Stichprobe mit float64.
+
+    Returns:
+        Grösster Fehler relativ zur erlaubten Abweichung FLOAT32_RTOL * B + FLOAT32_ATOL (<= 1 ist in Ordnung)
+    """
+    idx = np.unique(np.linspace(0, len(points) - 1, min(n_samples, len(points))).astype(int))
+    B_ref = calculate_rms_chunked(points[idx], paths, I_rms, f, r_wire, mu_0, mode)
+    allowed = FLOAT32_RTOL * B_ref + FLOAT32_ATOL
+    return float(np.max(np.abs(B_rms[idx] - B_ref) / allowed))
+
+
+def calculate_field_polyline(X: np.ndarray, Y: Any, Z: Any, paths: Conductors, I_rms: float | np.ndarray, f: float,
+                             r_wire: float = R_WIRE, mu_0: float = MU_0, mode: str = "phasor",
+                             cache: KernelCache | None = None, max_memory: int = DEFAULT_MAX_MEMORY,
+                             dtype: type = np.float64) -> np.ndarray:
+    """
+    Effektivwert der magnetischen Flussdichte beliebiger Leiterverläufe (Polylinien) in µT.
+    Ohne Cache wird blockweise im Speicherbudget gerechnet; mit Cache werden die Einheitsstrom-Felder
+    aller Punkte gemeinsam in einem Broadcast ausgewertet und zwischengespeichert.
+
+    Args:
+        X, Y, Z: Koordinaten der Aufpunkte [m], Skalare werden auf die Gitterform gebracht
+        paths: Leiterverläufe mit Phasenlage 'shift' oder Leitertabelle (ConductorSet)
+        I_rms: Effektivwert des Leiterstroms [A], Skalar oder je Leiter (C,)
+        f: Frequenz [Hz]
+        r_wire: Leiterradius [m]
+        mu_0: Magnetische Feldkonstante [Vs/Am]
+        mode: "phasor" (exakt) oder "time_steps" (12 Zeitschritte als Referenz)
+        cache: Optionaler KernelCache für die Einheitsstrom-Felder
+        max_memory: Speicherbudget der blockweisen Auswertung in Bytes (nur ohne Cache)
+        dtype: Rechen-Datentyp; np.float32 rechnet immer blockweise mit Genauigkeitsprüfung
+
+    Returns:
+        Effektivwert von B in µT mit der Form der Gitter
+    """
+    points, shape = get_points(X, Y, Z)
+    if cache is None or np.dtype(dtype) != np.float64:
+        B_rms = calculate_rms_chunked(points, paths, I_rms, f, r_wire, mu_0, mode, max_memory, dtype)
+        return B_rms.reshape(shape) * 1e6
+    unit_fields = get_path_unit_fields(points, paths, r_wire, mu_0, cache)
+    B_rms = calculate_rms_from_unit_fields(unit_fields, get_shifts(paths), I_rms, f, mode)
+    return B_rms.reshape(shape) * 1e6
+
+
+def calculate_field_points(points: Any, paths: Conductors, I_rms: float | np.ndarray, f: float, r_wire: float = R_WIRE,
+                           mu_0: float = MU_0, mode: str = "phasor", max_memory: int = DEFAULT_MAX_MEMORY,
+                           dtype: type = np.float64) -> np.ndarray:
+    """
+    Effektivwert der magnetischen Flussdichte an einzelnen Aufpunkten (z.B. Orte mit empfindlicher
+    Nutzung) in µT, ohne Gitter. Die Punktliste wird nicht kopiert und immer blockweise ausgewertet,
+    der Speicherbedarf hängt damit nicht von der Anzahl Punkte ab.
+
+    Args:
+        points: Aufpunkte der Form (N, 3) oder ein einzelner Punkt (3,) [m]
+        paths: Leiterverläufe mit Phasenlage 'shift' oder Leitertabelle (ConductorSet)
+        I_rms: Effektivwert des Leiterstroms [A], Skalar oder je Leiter (C,)
+        f: Frequenz [Hz]
+        r_wire: Leiterradius [m]
+        mu_0: Magnetische Feldkonstante [Vs/Am]
+        mode: "phasor" (exakt) oder "time_steps" (12 Zeitschritte als Referenz)
+        max_memory: Speicherbudget der Zwischenergebnisse in Bytes
+        dtype: Rechen-Datentyp, np.float64 oder np.float32 mit Genauigkeitsprüfung
+
+    Returns:
+        Effektivwert von B in µT der Form (N,)
+    """
+    points = np.ascontiguousarray(points, dtype=float)
+    if points.ndim == 1:
+        points = points[None, :]
+    if points.ndim != 2 or points.shape[1] != 3:
+        raise ValueError(f"Aufpunkte der Form (N, 3) erwartet, erhalten {points.shape}")
+    return calculate_rms_chunked(points, paths, I_rms, f, r_wire, mu_0, mode, max_memory, dtype) * 1e6
+
+
+def calculate_field_with_bend(X: np.ndarray, Y: Any, Z: Any, phases: list[dict[str, Any]], I_rms: float, f: float,
+                              alpha_rad: float, L_calc: float | None = None, r_wire: float = R_WIRE, mu_0: float = MU_0,
+                              mode: str = "phasor", cache: KernelCache | None = None,
+                              max_memory: int = DEFAULT_MAX_MEMORY, dtype: type = np.float64) -> np.ndarray:
+    """
+    Effektivwert der magnetischen Flussdichte eines Drehstromsystems mit Knick in µT.
+
+    Args:
+        X, Y, Z: Koordinaten der Aufpunkte [m], Y und Z dürfen Skalare sein
+        phases: Liste der Leiter mit 'pos' (x, y) und 'shift' (Phasenlage in rad)
+        I_rms: Effektivwert des Leiterstroms [A]
+        f: Frequenz [Hz]
+        alpha_rad: Knickwinkel [rad]
+        L_calc: Rechenlänge der Leiter [m], None für exakt halbunendliche Zuleitungen
+        r_wire: Leiterradius [m]
+        mu_0: Magnetische Feldkonstante [Vs/Am]
+        mode: "phasor" (exakt, ein Durchlauf pro Leiter) oder "time_steps" (12 Zeitschritte als Referenz)
+        cache: Optionaler KernelCache für die Einheitsstrom-Felder
+        max_memory: Speicherbudget der blockweisen Auswertung in Bytes (nur ohne Cache)
+        dtype: Rechen-Datentyp, np.float32 mit eingebauter Genauigkeitsprüfung gegen float64
+
+    Returns:
+        Effektivwert von B in µT mit der Form von X
+    """
+    conductor_set = ConductorSet.from_phases(phases, I_rms, alpha_rad, L_calc)
+    return calculate_field_polyline(X, Y, Z, conductor_set, I_rms, f, r_wire, mu_0, mode, cache, max_memory, dtype)
+
+
+def calculate_field_conductor_set(X: np.ndarray, Y: Any, Z: Any, conductor_set: ConductorSet, f: float,
+                                  r_wire: float = R_WIRE, mu_0: float = MU_0, mode: str = "phasor",
+                                  cache: KernelCache | None = None, max_memory: int = DEFAULT_MAX_MEMORY,
+                                  dtype: type = np.float64) -> np.ndarray:
+    """
+    Effektivwert der magnetischen Flussdichte eines Kabelgrabens mit mehreren Systemen in µT.
+    Ströme und Phasenlagen stammen aus der Leitertabelle; alle Segmente werden gemeinsam ausgewertet.
+
+    Args:
+        X, Y, Z: Koordinaten der Aufpunkte [m], Skalare werden auf die Gitterform gebracht
+        conductor_set: Leitertabelle mit Trassenführung
+        f: Frequenz [Hz]
+        r_wire: Leiterradius [m]
+        mu_0: Magnetische Feldkonstante [Vs/Am]
+        mode: "phasor" (exakt) oder "time_steps" (12 Zeitschritte als Referenz)
+        cache: Optionaler KernelCache für die Einheitsstrom-Felder
+        max_memory: Speicherbudget der blockweisen Auswertung in Bytes (nur ohne Cache)
+        dtype: Rechen-Datentyp, np.float32 mit eingebauter Genauigkeitsprüfung gegen float64
+
+    Returns:
+        Effektivwert von B in µT mit der Form der Gitter
+    """
+    return calculate_field_polyline(X, Y, Z, conductor_set, conductor_set.currents, f, r_wire, mu_0, mode, cache,
+                                    max_memory, dtype)
@@ -0,0 +1,276 @@
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+# Datentyp einer Leitertabelle: Bezeichnung, Systemnummer, Lage (x, y) in m, Effektivwert in A, Phasenlage in rad
+CONDUCTOR_DTYPE = np.dtype([('name', 'U16'), ('circuit', 'i4'), ('x', 'f8'), ('y', 'f8'), ('I_rms', 'f8'),
+                            ('shift', 'f8')])
+
+# Phasenlagen L1, L2, L3 eines Drehstromsystems
+THREE_PHASE_SHIFTS = (0.0, 2 * np.pi / 3, 4 * np.pi / 3)
+
+
+@dataclass
+class ConductorPath:
+    """
+    Leiterverlauf als Polylinie mit N Stützpunkten (N-1 gerade Segmente).
+    Mit open_start bzw. open_end beginnt bzw. endet der Leiter im Unendlichen: das erste Segment
+    kommt aus Richtung vertices[0] und endet in vertices[1], das letzte startet in vertices[-2]
+    und verläuft über vertices[-1] hinaus.
+
+    Attributes:
+        vertices: Stützpunkte der Form (N, 3) in m
+        shift: Phasenlage des Leiterstroms in rad
+        name: Bezeichnung, z.B. 'L1'
+        open_start: Erstes Segment halbunendlich (Anfang im Unendlichen)
+        open_end: Letztes Segment halbunendlich (Ende im Unendlichen)
+    """
+    vertices: np.ndarray
+    shift: float = 0.0
+    name: str = ""
+    open_start: bool = False
+    open_end: bool = False
+
+    def __post_init__(self) -> None:
+        self.vertices = np.asarray(self.vertices, dtype=float)
+        if self.vertices.ndim != 2 or self.vertices.shape[1] != 3 or len(self.vertices) < 2:
+            raise ValueError(f"Leiterverlauf '{self.name}' benötigt mindestens 2 Stützpunkte der Form (N, 3)")
+
+    @property
+    def n_segments(self) -> int:
+        return len(self.vertices) - 1
+
+    def get_segments(self) -> tuple[np.ndarray, np.ndarray]:
+        # Start- und Endpunkte aller Segmente, je Form (N-1, 3)
+        return self.vertices[:-1], self.vertices[1:]
+
+    def get_infinite_flags(self) -> tuple[np.ndarray, np.ndarray]:
+        # Markiert je Segment, ob Anfang bzw. Ende im Unendlichen liegen
+        start_infinite = np.zeros(self.n_segments, dtype=bool)
+        end_infinite = np.zeros(self.n_segments, dtype=bool)
+        start_infinite[0] = self.open_start
+        end_infinite[-1] = self.open_end
+        return start_infinite, end_infinite
+
+
+@dataclass
+class SegmentSet:
+    """
+    Segmente mehrerer Leiterverläufe als zusammenhängende Arrays für die gebündelte Auswertung.
+
+    Attributes:
+        starts: Startpunkte der Form (S, 3) in m
+        ends: Endpunkte der Form (S, 3) in m
+        start_infinite: Anfang des Segments im Unendlichen, Form (S,)
+        end_infinite: Ende des Segments im Unendlichen, Form (S,)
+        offsets: Index des ersten Segments je Leiter
+    """
+    starts: np.ndarray
+    ends: np.ndarray
+    start_infinite: np.ndarray
+    end_infinite: np.ndarray
+    offsets: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+def get_bend_path(pos: tuple[float, float], alpha_rad: float, L_calc: float | None = None, shift: float = 0.0,
+                  name: str = "") -> ConductorPath:
+    """
+    Leiter mit Knick bei z=0 wie in den Skripten: gerade Zuleitung bis z=0,
+    danach um alpha_rad in der X-Z-Ebene abgewinkelt.
+    Ohne L_calc sind beide Zuleitungen exakt halbunendlich, sonst je L_calc / 2 lang.
+    """
+    px, py = pos
+    dir_vec = np.array([np.sin(alpha_rad), 0, np.cos(alpha_rad)])
+    knee = np.array([px, py, 0.0])
+    if L_calc is None:
+        # Richtungspunkte im Abstand 1 m, die Segmente laufen ins Unendliche weiter
+        vertices = np.array([knee - [0.0, 0.0, 1.0], knee, knee + dir_vec])
+        return ConductorPath(vertices, shift=shift, name=name, open_start=True, open_end=True)
+    vertices = np.array([[px, py, -L_calc / 2], knee, knee + (L_calc / 2) * dir_vec])
+    return ConductorPath(vertices, shift=shift, name=name)
+
+
+def get_paths_from_phases(phases: list[dict[str, Any]], alpha_rad: float,
+                          L_calc: float | None = None) -> list[ConductorPath]:
+    # Übersetzt die 'phases'-Liste der Skripte in Leiterverläufe
+    return [get_bend_path(p['pos'], alpha_rad, L_calc, shift=p['shift'], name=p.get('name', ""))
+            for p in phases]
+
+
+def stack_path_segments(paths: list[ConductorPath]) -> SegmentSet:
+    # Fasst die Segmente aller Leiterverläufe zu Arrays zusammen
+    starts = np.concatenate([p.get_segments()[0] for p in paths])
+    ends = np.concatenate([p.get_segments()[1] for p in paths])
+    start_infinite = np.concatenate([p.get_infinite_flags()[0] for p in paths])
+    end_infinite = np.concatenate([p.get_infinite_flags()[1] for p in paths])
+    offsets = np.cumsum([0] + [p.n_segments for p in paths[:-1]])
+    return SegmentSet(starts, ends, start_infinite, end_infinite, offsets)
+
+
+@dataclass
+class SegmentGroup:
+    """
+    Parallele, gegeneinander verschobene Segmente gleicher Länge (je ein Segment pro Leiter), z.B. die
+    Zuleitungen aller Phasen. Die Verschiebungen zum Bezugssegment sind in Längsrichtung (a) und
+    komplex in der Querebene (b = Anteil e1 + j * Anteil e2) angegeben.
+
+    Attributes:
+        start: Startpunkt des Bezugssegments (Mittel der Startpunkte) in m
+        unit: Richtung der Segmente
+        e1, e2: Querachsen mit e1 x e2 = unit
+        length: Segmentlänge in m
+        start_infinite: Anfang im Unendlichen
+        end_infinite: Ende im Unendlichen
+        a: Längsverschiebungen je Leiter (C,) in m
+        b: Querverschiebungen je Leiter (C,) komplex in m
+        radius: Grösste Verschiebung in m
+    """
+    start: np.ndarray
+    unit: np.ndarray
+    e1: np.ndarray
+    e2: np.ndarray
+    length: float
+    start_infinite: bool
+    end_infinite: bool
+    a: np.ndarray
+    b: np.ndarray
+    radius: float
+
+
+def get_segment_groups(paths: list[ConductorPath], atol: float = 1e-9) -> list[SegmentGroup] | None:
+    """
+    Fasst die Segmente gleichen Index aller Leiter zu Gruppen zusammen.
+
+    Returns:
+        Gruppen oder None, wenn die Leiter keine verschobenen Kopien voneinander sind
+    """
+    if len({p.n_segments for p in paths}) != 1 or len({(p.open_start, p.open_end) for p in paths}) != 1:
+        return None
+    groups = []
+    for i in range(paths[0].n_segments):
+        starts = np.array([p.vertices[i] for p in paths])
+        vectors = np.array([p.vertices[i + 1] - p.vertices[i] for p in paths])
+        if not np.allclose(vectors, vectors[0], rtol=0.0, atol=atol):
+            return None
+        length = float(np.linalg.norm(vectors[0]))
+        unit = vectors[0] / length
+        # Querachsen: e1 senkrecht zur Richtung, e2 = unit x e1
+        helper = np.eye(3)[np.argmin(np.abs(unit))]
+        e1 = np.cross(helper, unit)
+        e1 /= np.linalg.norm(e1)
+        e2 = np.cross(unit, e1)
+        start = starts.mean(axis=0)
+        offsets = starts - start
+        groups.append(SegmentGroup(start, unit, e1, e2, length, i == 0 and paths[0].open_start,
+                                   i == paths[0].n_segments - 1 and paths[0].open_end, offsets @ unit,
+                                   offsets @ e1 + 1j * (offsets @ e2), float(np.linalg.norm(offsets, axis=1).max())))
+    return groups
+
+
+def make_conductor_array(positions: Any, I_rms: float | np.ndarray, shifts: Any = THREE_PHASE_SHIFTS,
+                         circuit: int = 0, names: list[str] | None = None) -> np.ndarray:
+    """
+    Leitertabelle eines Systems, z.B. eines Drehstromsystems, Erdleiters oder Reserverohrs (I_rms = 0).
+    Mehrere Systeme werden mit np.concatenate zusammengefügt.
+
+    Args:
+        positions: Lagen (x, y) der Leiter, Form (C, 2) [m]
+        I_rms: Effektivwert je Leiter oder für alle Leiter [A]
+        shifts: Phasenlagen je Leiter [rad]
+        circuit: Systemnummer
+        names: Bezeichnungen, Standard 'L1', 'L2', ...
+
+    Returns:
+        Strukturiertes Array mit CONDUCTOR_DTYPE
+    """
+    positions = np.atleast_2d(np.asarray(positions, dtype=float))
+    data = np.zeros(len(positions), dtype=CONDUCTOR_DTYPE)
+    data['name'] = names if names is not None else [f"L{i + 1}" for i in range(len(positions))]
+    data['circuit'] = circuit
+    data['x'], data['y'] = positions[:, 0], positions[:, 1]
+    data['I_rms'] = I_rms
+    data['shift'] = shifts
+    return data
+
+
+@dataclass
+class ConductorSet:
+    """
+    Leiter eines Kabelgrabens als strukturiertes numpy-Array mit gemeinsamer Trassenführung
+    (Knick bei z=0 um alpha_rad wie in den Skripten). Die Segmente aller Leiter werden ohne
+    Python-Schleife über die Leiter erzeugt.
+
+    Attributes:
+        data: Leitertabelle mit CONDUCTOR_DTYPE
+        alpha_rad: Knickwinkel der Trasse [rad]
+        L_calc: Rechenlänge der Leiter [m], None für exakt halbunendliche Zuleitungen
+    """
+    data: np.ndarray
+    alpha_rad: float = 0.0
+    L_calc: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.data.dtype != CONDUCTOR_DTYPE:
+            raise ValueError("Leitertabelle benötigt den Datentyp CONDUCTOR_DTYPE (siehe make_conductor_array)")
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @classmethod
+    def from_phases(cls, phases: list[dict[str, Any]], I_rms: float, alpha_rad: float,
+                    L_calc: float | None = None) -> "ConductorSet":
+        # Übersetzt die 'phases'-Liste der Skripte (ein System, gleicher Strom in allen Leitern)
+        data = make_conductor_array([p['pos'] for p in phases], I_rms, [p['shift'] for p in phases],
+                                    names=[p.get('name', f"L{i + 1}") for i, p in enumerate(phases)])
+        return cls(data, alpha_rad, L_calc)
+
+    @property
+    def shifts(self) -> np.ndarray:
+        return self.data['shift']
+
+    @property
+    def currents(self) -> np.ndarray:
+        return self.data['I_rms']
+
+    def get_circuit_indices(self) -> dict[int, np.ndarray]:
+        # Leiter-Indizes je Systemnummer
+        return {int(c): np.nonzero(self.data['circuit'] == c)[0] for c in np.unique(self.data['circuit'])}
+
+    def get_segments(self) -> SegmentSet:
+        # Zwei Segmente je Leiter (Zuleitung bis zum Knick, abgewinkelter Abschnitt), leiterweise hintereinander
+        n = len(self.data)
+        dir_vec = np.array([np.sin(self.alpha_rad), 0.0, np.cos(self.alpha_rad)])
+        knees = np.stack([self.data['x'], self.data['y'], np.zeros(n)], axis=1)
+        open_ends = self.L_calc is None
+        half = 1.0 if open_ends else self.L_calc / 2
+        starts = np.stack([knees - [0.0, 0.0, half], knees], axis=1).reshape(-1, 3)
+        ends = np.stack([knees, knees + half * dir_vec], axis=1).reshape(-1, 3)
+        start_infinite = np.tile([open_ends, False], n)
+        end_infinite = np.tile([False, open_ends], n)
+        return SegmentSet(starts, ends, start_infinite, end_infinite, np.arange(0, 2 * n, 2))
+
+    def get_paths(self) -> list[ConductorPath]:
+        # Einzelne Leiterverläufe, z.B. für Auswertungen, die ConductorPath-Listen erwarten
+        segments = self.get_segments()
+        return [ConductorPath(np.array([segments.starts[2 * i], segments.ends[2 * i], segments.ends[2 * i + 1]]),
+                              shift=float(row['shift']), name=str(row['name']), open_start=self.L_calc is None,
+                              open_end=self.L_calc is None)
+                for i, row in enumerate(self.data)]
+
+
+# Leiterliste oder Leitertabelle, beide werden von den Feldberechnungen akzeptiert
+Conductors = list[ConductorPath] | ConductorSet
+
+
+def get_segment_set(conductors: Conductors) -> SegmentSet:
+    # Segmente einer Leiterliste oder Leitertabelle
+    return conductors.get_segments() if isinstance(conductors, ConductorSet) else stack_path_segments(conductors)
+
+
+def get_shifts(conductors: Conductors) -> np.ndarray:
+    # Phasenlagen je Leiter
+    return conductors.shifts if isinstance(conductors, ConductorSet) else np.array([p.shift for p in conductors])
@@ -0,0 +1,126 @@
+import base64
+import json
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+from plotly.utils import PlotlyJSONEncoder
+
+# Kodierungen der Gitter: float32 (4 Bytes je Wert) oder uint16 auf logarithmischer Skala (2 Bytes je Wert)
+ENCODINGS = ("float32", "uint16")
+DEFAULT_ENCODING = "uint16"
+
+# uint16: 0 ist für Werte <= 0 reserviert, 1..65535 decken [log(min), log(max)] der positiven Werte ab
+_UINT16_LEVELS = 65534
+
+# Dekodiert die Gitter einmal je Frame und setzt dasselbe Array in alle Konturebenen ein ({plot_id} setzt plotly)
+_FRAMES_SCRIPT = """
+var payload = %s;
+function decodeGrid(grid) {
+    var binary = atob(grid.bdata), bytes = new Uint8Array(binary.length);
+    for (var i = 0; i < binary.length; i++) { bytes[i] = binary.charCodeAt(i); }
+    var values;
+    if (grid.dtype === "f4") {
+        values = new Float32Array(bytes.buffer);
+    } else {
+        var q = new Uint16Array(bytes.buffer);
+        values = new Float32Array(q.length);
+        for (var j = 0; j < q.length; j++) {
+            values[j] = q[j] === 0 ? 0 : Math.exp(grid.log_min + (q[j] - 1) * grid.log_step);
+        }
+    }
+    var rows = [], n = grid.shape[1];
+    for (var r = 0; r < grid.shape[0]; r++) { rows.push(values.subarray(r * n, (r + 1) * n)); }
+    return rows;
+}
+var frames = payload.names.map(function(name, k) {
+    var z = decodeGrid(payload.grids[k]);
+    var data = payload.traces.map(function() { return {z: z}; }).concat(payload.extra_data[k]);
+    var frame = {name: name, data: data, traces: payload.traces.concat(payload.extra_traces)};
+    if (payload.titles) { frame.layout = {title: {text: payload.titles[k]}}; }
+    return frame;
+});
+Plotly.addFrames('{plot_id}', frames);
+"""
+
+
+def encode_grid(z: np.ndarray, encoding: str = DEFAULT_ENCODING) -> dict[str, Any]:
+    """
+    Kodiert ein 2D-Gitter als base64-Typed-Array (Little Endian) für die Übertragung an plotly.js.
+
+    Args:
+        z: Werte der Form (ny, nx), z.B. B in µT
+        encoding: "float32" oder "uint16" (logarithmisch quantisiert, relativer Fehler höchstens eine halbe
+            Stufe, z.B. 0.013 % bei einem Wertebereich von 1e-3 bis 1e4)
+
+    Returns:
+        Dictionary mit dtype, shape, bdata und bei uint16 den Skalierungsparametern log_min und log_step
+    """
+    z = np.asarray(z, dtype=float)
+    if z.ndim != 2:
+        raise ValueError(f"Gitter muss 2D sein, erhalten: Form {z.shape}")
+    if encoding == "float32":
+        return {"dtype": "f4", "shape": list(z.shape), "bdata": _to_base64(z.astype("<f4"))}
+    if encoding != "uint16":
+        raise ValueError(f"Unbekannte Kodierung '{encoding}', erlaubt: {ENCODINGS}")
+
+    positive = z > 0
+    log_z = np.log(np.where(positive, z, 1.0))
+    log_min = float(log_z[positive].min()) if positive.any() else 0.0
+    log_max = float(log_z[positive].max()) if positive.any() else 0.0
+    log_step = (log_max - log_min) / _UINT16_LEVELS if log_max > log_min else 1.0
+    q = np.where(positive, np.rint((log_z - log_min) / log_step) + 1, 0).astype("<u2")
+    return {"dtype": "u2", "shape": list(z.shape), "bdata": _to_base64(q), "log_min": log_min, "log_step": log_step}
+
+
+def decode_grid(grid: dict[str, Any]) -> np.ndarray:
+    # Umkehrung von encode_grid in Python, gleiche Rechnung wie decodeGrid im Browser
+    raw = base64.b64decode(grid["bdata"])
+    if grid["dtype"] == "f4":
+        values = np.frombuffer(raw, dtype="<f4").astype(float)
+    else:
+        q = np.frombuffer(raw, dtype="<u2")
+        values = np.where(q == 0, 0.0, np.exp(grid["log_min"] + (q.astype(float) - 1) * grid["log_step"]))
+    return values.reshape(grid["shape"])
+
+
+def get_frames_script(grids: Sequence[np.ndarray] | np.ndarray, names: Sequence[str], traces: Sequence[int] = (0, 1, 2),
+                      titles: Sequence[str] | None = None, extra_data: Sequence[Sequence[Any]] | None = None,
+                      extra_traces: Sequence[int] | None = None, encoding: str = DEFAULT_ENCODING) -> str:
+    """
+    Slider-Frames als kompaktes Skript für fig.show(post_script=...) bzw. fig.write_html(post_script=...):
+    jedes Gitter wird einmal binär übertragen und im Browser in alle Konturebenen (traces) eingesetzt,
+    statt je Frame und Ebene als JSON-Text. Die Figure selbst enthält dafür keine Frames.
+
+    Args:
+        grids: Gitter je Frame, z.B. B_slices der Form (K, ny, nx)
+        names: Frame-Namen wie in den Slider-Schritten (args der Methode "animate")
+        traces: Indizes der Konturebenen, die das Gitter des Frames erhalten
+        titles: Titel je Frame (layout.title.text) oder None
+        extra_data: Weitere Traces je Frame, z.B. Marker als go.Scatter oder Dictionaries
+        extra_traces: Indizes der weiteren Traces, standardmässig direkt nach den Konturebenen
+        encoding: "float32" oder "uint16", siehe encode_grid
+
+    Returns:
+        JavaScript, das die Frames dekodiert und mit Plotly.addFrames hinzufügt
+    """
+    if len(grids) != len(names):
+        raise ValueError(f"Anzahl Gitter ({len(grids)}) und Frame-Namen ({len(names)}) verschieden")
+    if extra_data is None:
+        extra_data = [[] for _ in names]
+    n_extra = len(extra_data[0]) if len(extra_data) else 0
+    if extra_traces is None:
+        extra_traces = range(max(traces) + 1, max(traces) + 1 + n_extra)
+    payload = {
+        "names": list(names),
+        "grids": [encode_grid(z, encoding) for z in grids],
+        "traces": [int(i) for i in traces],
+        "titles": list(titles) if titles is not None else None,
+        "extra_data": [list(data) for data in extra_data],
+        "extra_traces": [int(i) for i in extra_traces],
+    }
+    return _FRAMES_SCRIPT % json.dumps(payload, cls=PlotlyJSONEncoder, separators=(",", ":"))
+
+
+def _to_base64(a: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(a).tobytes()).decode("ascii")
@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from src.utils import biot_savart
+from src.utils.conductors import Conductors
+from src.utils.kernel_cache import KernelCache
+from src.utils.scenarios import ScenarioSweep
+
+
+@dataclass
+class HarmonicSpectrum:
+    """
+    Oberschwingungsspektrum der Leiterströme.
+
+    Attributes:
+        orders: Ordnungszahlen h der Harmonischen (H,), 1 = Grundschwingung
+        I_rms: Effektivwerte je Harmonischer und Leiter der Form (H, C) in A
+        shifts: Phasenlagen je Harmonischer und Leiter der Form (H, C) in rad
+    """
+    orders: np.ndarray
+    I_rms: np.ndarray
+    shifts: np.ndarray
+
+    def __post_init__(self) -> None:
+        self.orders = np.atleast_1d(np.asarray(self.orders, dtype=int))
+        self.I_rms, self.shifts = (np.array(a, dtype=float) for a in np.broadcast_arrays(
+            np.asarray(self.I_rms, dtype=float).reshape(len(self.orders), -1),
+            np.asarray(self.shifts, dtype=float).reshape(len(self.orders), -1)))
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    @classmethod
+    def from_fractions(cls, I_rms: Any, shifts: Any, fractions: dict[int, float]) -> "HarmonicSpectrum":
+        """
+        Spektrum aus Anteilen der Grundschwingung. Die Phasenlage der h-ten Harmonischen ist h-mal die
+        Phasenlage der Grundschwingung; im symmetrischen Drehstromsystem bilden die durch 3 teilbaren
+        Ordnungen damit ein Nullsystem (gleichphasig in allen Leitern), 5, 11, ... ein Gegensystem.
+
+        Args:
+            I_rms: Effektivwert der Grundschwingung, Skalar oder je Leiter (C,) [A]
+            shifts: Phasenlagen der Grundschwingung je Leiter (C,) [rad]
+            fractions: Anteil je Ordnung relativ zur Grundschwingung, z.B. {1: 1.0, 3: 0.2, 5: 0.1}
+
+        Returns:
+            HarmonicSpectrum
+        """
+        orders = np.array(sorted(fractions))
+        I_rms, shifts = np.broadcast_arrays(np.asarray(I_rms, dtype=float), np.asarray(shifts, dtype=float))
+        return cls(orders, np.array([fractions[h] * I_rms for h in orders]), orders[:, None] * shifts[None, :])
+
+    def get_currents(self) -> np.ndarray:
+        # Komplexe Scheitelwert-Zeiger je Harmonischer und Leiter (H, C)
+        return biot_savart.get_phase_current_phasor(self.I_rms, self.shifts)
+
+    def get_current_rms(self) -> np.ndarray:
+        # Gesamteffektivwert je Leiter über alle Harmonischen
+        return np.sqrt(np.sum(self.I_rms**2, axis=0))
+
+
+def calculate_harmonic_rms(sweep: ScenarioSweep, spectrum: HarmonicSpectrum) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Effektivwert von B aus einem Stromspektrum mit den Einheitsstrom-Feldern des Sweeps. Die Geometrie
+    hängt nicht von der Frequenz ab, jede Harmonische ist nur eine Linearkombination; die Harmonischen
+    sind orthogonal, der Gesamteffektivwert ist die Wurzel der Quadratsumme.
+
+    Args:
+        sweep: ScenarioSweep mit den Einheitsstrom-Feldern der Leiter
+        spectrum: Oberschwingungsspektrum der Leiterströme
+
+    Returns:
+        Gesamteffektivwert in µT mit der Form der Gitter und Effektivwerte je Harmonischer (H, *Gitterform)
+    """
+    B_harmonics = sweep.calculate_rms(spectrum.get_currents())
+    return np.sqrt(np.sum(B_harmonics**2, axis=0)), B_harmonics
+
+
+def calculate_harmonic_field(X: np.ndarray, Y: Any, Z: Any, paths: Conductors, spectrum: HarmonicSpectrum,
+                             r_wire: float = biot_savart.R_WIRE, mu_0: float = biot_savart.MU_0,
+                             cache: KernelCache | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Effektivwert der magnetischen Flussdichte bei oberschwingungsbehafteten Strömen in µT.
+
+    Args:
+        X, Y, Z: Koordinaten der Aufpunkte [m], Skalare werden auf die Gitterform gebracht
+        paths: Leiterverläufe oder Leitertabelle, die Ströme stammen aus dem Spektrum
+        spectrum: Oberschwingungsspektrum der Leiterströme
+        r_wire: Leiterradius [m]
+        mu_0: Magnetische Feldkonstante [Vs/Am]
+        cache: Optionaler KernelCache für die Einheitsstrom-Felder
+
+    Returns:
+        Gesamteffektivwert in µT mit der Form der Gitter und Effektivwerte je Harmonischer (H, *Gitterform)
+    """
+    return calculate_harmonic_rms(ScenarioSweep(X, Y, Z, paths, r_wire, mu_0, cache), spectrum)
@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from src.utils import biot_savart
+from src.utils.conductors import Conductors, get_segment_set, get_shifts
+from src.utils.kernel_cache import DEFAULT_MAX_BYTES, KernelCache, fingerprint_arrays
+from src.utils.slice_stack import PlaneStack
+
+
+@dataclass
+class UpdateStats:
+    """
+    Arbeit der letzten Auswertung.
+
+    Attributes:
+        segments_computed: Neu berechnete Segmentbeiträge
+        paths_summed: Neu summierte Leiterbeiträge
+        combined: Effektivwert neu kombiniert (False: Ergebnis unverändert übernommen)
+    """
+    segments_computed: int = 0
+    paths_summed: int = 0
+    combined: bool = False
+
+
+class IncrementalField:
+    """
+    Abhängigkeitsgraph der Feldberechnung auf festen Aufpunkten:
+    Segmentgeometrie -> Segmentbeitrag (Einheitsstrom-Feld) -> Leiterbeitrag (Summe der Segmente)
+    -> Effektivwert (Ströme, Phasenlagen). Jeder Knoten ist über den Fingerabdruck seiner Eingaben
+    adressiert; bei einer Änderung werden nur die betroffenen Knoten neu berechnet, z.B. bei neuem
+    Knickwinkel nur das abgewinkelte Segment je Phase, bei neuem Strom nur die Kombination.
+    Segmentbeiträge liegen im LRU-Cache mit Speicherbudget, die Leiterbeiträge nur für die zuletzt
+    ausgewerteten Leiter (sie werden für die Kombination ohnehin benötigt).
+    """
+
+    def __init__(self, X: np.ndarray, Y: Any, Z: Any, r_wire: float = biot_savart.R_WIRE,
+                 mu_0: float = biot_savart.MU_0, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_memory: int = biot_savart.DEFAULT_MAX_MEMORY) -> None:
+        """
+        Legt den Graphen für die Aufpunkte an.
+
+        Args:
+            X, Y, Z: Koordinaten der Aufpunkte [m], Skalare werden auf die Gitterform gebracht
+            r_wire: Leiterradius [m]
+            mu_0: Magnetische Feldkonstante [Vs/Am]
+            max_bytes: Speicherbudget der Segmentbeiträge, ältere Varianten werden verdrängt
+            max_memory: Speicherbudget der Kernel-Puffer bei der blockweisen Berechnung neuer Segmente
+        """
+        self.points, self.shape = biot_savart.get_points(X, Y, Z)
+        self.r_wire = r_wire
+        self.mu_0 = mu_0
+        self.max_memory = max_memory
+        self.contributions = KernelCache(max_bytes)
+        self.stats = UpdateStats()
+        self._path_fields: dict[tuple, np.ndarray] = {}
+        self._result_key: tuple | None = None
+        self._result: np.ndarray | None = None
+
+    @classmethod
+    def from_plane_stack(cls, planes: PlaneStack, U: np.ndarray, V: np.ndarray, **kwargs: Any) -> "IncrementalField":
+        # Graph über alle Ebenen eines Schnittstapels, Ergebnis der Form (K, *U.shape) wie calculate_plane_stack
+        points = planes.get_points(U, V).reshape(len(planes), *np.shape(U), 3)
+        return cls(points[..., 0], points[..., 1], points[..., 2], **kwargs)
+
+    def evaluate(self, paths: Conductors, I_rms: float | np.ndarray, f: float, mode: str = "phasor") -> np.ndarray:
+        """
+        Effektivwert von B in µT; berechnet nur die Beiträge, deren Eingaben sich geändert haben.
+
+        Args:
+            paths: Leiterverläufe mit Phasenlage 'shift' oder Leitertabelle (ConductorSet)
+            I_rms: Effektivwert des Leiterstroms [A], Skalar oder je Leiter (C,)
+            f: Frequenz [Hz]
+            mode: "phasor" (exakt) oder "time_steps" (12 Zeitschritte als Referenz)
+
+        Returns:
+            Effektivwert von B in µT mit der Form der Gitter (schreibgeschützt)
+        """
+        self.stats = UpdateStats()
+        segments = get_segment_set(paths)
+        segment_keys = [fingerprint_arrays(segments.starts[i], segments.ends[i], segments.start_infinite[i],
+                                           segments.end_infinite[i]) for i in range(len(segments))]
+        bounds = list(segments.offsets) + [len(segments)]
+        path_keys = [tuple(segment_keys[bounds[c]:bounds[c + 1]]) for c in range(len(segments.offsets))]
+        shifts = get_shifts(paths)
+
+        result_key = (tuple(path_keys), fingerprint_arrays(np.asarray(I_rms, dtype=float), shifts, f), mode)
+        if result_key == self._result_key and self._result is not None:
+            return self._result
+
+        # Segmentbeiträge der Leiter ohne Summe: vorhandene zuerst nachschlagen (markiert sie als zuletzt verwendet,
+        # neue Einträge verdrängen damit ältere Varianten) und lokal halten, fehlende gemeinsam berechnen. Summiert
+        # wird nur aus den lokal gehaltenen Feldern, Verdrängungen innerhalb dieses Aufrufs sind damit unschädlich.
+        stale_keys = list(dict.fromkeys(segment_key for key in path_keys if key not in self._path_fields
+                                        for segment_key in key))
+        fields = {}
+        for segment_key in stale_keys:
+            field = self.contributions.lookup(("segment", segment_key))
+            if field is not None:
+                fields[segment_key] = field
+        missing = [segment_key for segment_key in stale_keys if segment_key not in fields]
+        segment_index = {key: i for i, key in enumerate(segment_keys)}
+        fields.update(self._compute_segments(segments, [segment_index[key] for key in missing], missing))
+
+        unit_fields = np.empty((len(path_keys), 3, len(self.points)))
+        for c, key in enumerate(path_keys):
+            path_field = self._path_fields.get(key)
+            if path_field is None:
+                unit_fields[c] = fields[key[0]]
+                for segment_key in key[1:]:
+                    unit_fields[c] += fields[segment_key]
+                self.stats.paths_summed += 1
+            else:
+                unit_fields[c] = path_field
+        self._path_fields = dict(zip(path_keys, unit_fields))
+
+        B_rms = biot_savart.calculate_rms_from_unit_fields(unit_fields, shifts, I_rms, f, mode)
+        self._result = B_rms.reshape(self.shape) * 1e6
+        self._result.setflags(write=False)
+        self._result_key = result_key
+        self.stats.combined = True
+        return self._result
+
+    def _compute_segments(self, segments: Any, idx: list[int], keys: list[str]) -> dict[str, np.ndarray]:
+        # Segmentbeiträge in einem Broadcast, blockweise über die Punkte mit wiederverwendeten Kernel-Puffern;
+        # liefert die Felder je Schlüssel und legt sie zusätzlich im Cache ab (soweit das Budget reicht)
+        if not idx:
+            return {}
+        chunk_size = min(len(self.points), biot_savart.get_chunk_size(len(idx), 0, self.max_memory))
+        scratch = biot_savart.KernelScratch(len(idx), chunk_size)
+        computed = np.empty((len(idx), 3, len(self.points)))
+        for i0 in range(0, len(self.points), chunk_size):
+            block = self.points[i0:i0 + chunk_size]
+            computed[:, :, i0:i0 + len(block)] = biot_savart.get_unit_b_vectors_batched(
+                block, segments.starts[idx], segments.ends[idx], segments.start_infinite[idx],
+                segments.end_infinite[idx], self.r_wire, self.mu_0, scratch)
+        for key, field in zip(keys, computed):
+            self.contributions.put(("segment", key), field)
+        self.stats.segments_computed += len(idx)
+        return dict(zip(keys, computed))
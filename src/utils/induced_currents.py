@@ -0,0 +1,117 @@
+from typing import Any
+
+import numpy as np
+from scipy.linalg import lu_factor, lu_solve
+
+from src.utils import biot_savart
+from src.utils.conductors import ConductorSet
+from src.utils.kernel_cache import KernelCache, fingerprint_arrays
+
+# Spezifischer Erdwiderstand [Ohm m], typischer Wert für feuchten Boden
+RHO_EARTH = 100.0
+
+
+def get_earth_return_depth(f: float, rho_earth: float = RHO_EARTH) -> float:
+    # Äquivalente Tiefe des Erdrückleiters nach Carson [m]
+    return 658.5 * np.sqrt(rho_earth / f)
+
+
+def get_carson_impedances(xy_rows: np.ndarray, xy_cols: np.ndarray, d_min: np.ndarray, f: float,
+                          rho_earth: float = RHO_EARTH) -> np.ndarray:
+    """
+    Längsimpedanzen pro Meter zwischen Leitern mit Erdrückleitung (vereinfachte Carson-Formeln):
+    Z_ij = omega * mu_0 / 8 + j * omega * mu_0 / (2 pi) * ln(D_e / d_ij).
+
+    Args:
+        xy_rows: Lagen (x, y) der Zeilenleiter (n, 2) [m]
+        xy_cols: Lagen (x, y) der Spaltenleiter (m, 2) [m]
+        d_min: Kleinster Abstand je Zeilenleiter (n,) [m]: mittlerer Radius eines Schirms (gilt auch
+            gegenüber dem eigenen Kabelkern) bzw. geometrischer Mittelradius beim eigenen Leiter
+        f: Frequenz [Hz]
+        rho_earth: Spezifischer Erdwiderstand [Ohm m]
+
+    Returns:
+        Komplexe Impedanzen der Form (n, m) [Ohm/m] ohne Leiterwiderstände
+    """
+    omega = 2 * np.pi * f
+    distances = np.linalg.norm(xy_rows[:, None, :] - xy_cols[None, :, :], axis=2)
+    distances = np.maximum(distances, d_min[:, None])
+    D_e = get_earth_return_depth(f, rho_earth)
+    return omega * biot_savart.MU_0 / 8 + 1j * omega * biot_savart.MU_0 / (2 * np.pi) * np.log(D_e / distances)
+
+
+class InducedCurrentSolver:
+    """
+    Induzierte Ströme in beidseitig geerdeten passiven Leitern (Kabelschirme, Erdseile) aus den
+    Strömen der aktiven Leiter: Z_pp I_p = -Z_pa I_a (Spannung entlang der passiven Leiter null).
+    Lastvarianten benötigen nach der LU-Zerlegung von Z_pp nur noch Vorwärts-/Rückwärtseinsetzen; mit einem
+    gemeinsamen KernelCache wird die Zerlegung zudem über Löser gleicher Geometrie hinweg wiederverwendet.
+    """
+
+    def __init__(self, conductor_set: ConductorSet, passive: Any, resistance: Any, d_min: Any, f: float,
+                 rho_earth: float = RHO_EARTH, cache: KernelCache | None = None) -> None:
+        """
+        Stellt die Impedanzmatrizen auf.
+
+        Args:
+            conductor_set: Leitertabelle mit aktiven und passiven Leitern
+            passive: Indizes der passiven Leiter
+            resistance: Wechselstromwiderstand je passivem Leiter [Ohm/m]
+            d_min: Mittlerer Radius (Schirm) bzw. geometrischer Mittelradius (Erdseil) je passivem Leiter [m]
+            f: Frequenz [Hz]
+            rho_earth: Spezifischer Erdwiderstand [Ohm m]
+            cache: Optionaler KernelCache für die LU-Zerlegung je Geometrie, Frequenz und Erdwiderstand
+        """
+        self.passive: np.ndarray = np.atleast_1d(np.asarray(passive, dtype=int))
+        self.active: np.ndarray = np.setdiff1d(np.arange(len(conductor_set)), self.passive)
+        xy = np.stack([conductor_set.data['x'], conductor_set.data['y']], axis=1)
+        resistance = np.broadcast_to(np.asarray(resistance, dtype=float), self.passive.shape)
+        d_min = np.broadcast_to(np.asarray(d_min, dtype=float), self.passive.shape)
+
+        xy_p = xy[self.passive]
+        self.Z_pa: np.ndarray = get_carson_impedances(xy_p, xy[self.active], d_min, f, rho_earth)
+        key = fingerprint_arrays(xy_p, resistance, d_min, f, rho_earth)
+        self.factorization: tuple[np.ndarray, np.ndarray] = _get_factorization(
+            key, lambda: get_carson_impedances(xy_p, xy_p, d_min, f, rho_earth) + np.diag(resistance), cache)
+
+    def solve(self, active_currents: np.ndarray) -> np.ndarray:
+        """
+        Induzierte Ströme der passiven Leiter.
+
+        Args:
+            active_currents: Komplexe Stromzeiger der aktiven Leiter (..., n_active), z.B. (Szenarien, n_active)
+
+        Returns:
+            Komplexe Stromzeiger der passiven Leiter (..., n_passive) in gleicher Skalierung
+        """
+        active_currents = np.asarray(active_currents, dtype=complex)
+        rhs = -(active_currents.reshape(-1, len(self.active)) @ self.Z_pa.T)
+        return lu_solve(self.factorization, rhs.T).T.reshape(*active_currents.shape[:-1], len(self.passive))
+
+    def complete_currents(self, currents: np.ndarray) -> np.ndarray:
+        # Stromzeiger aller Leiter (..., C), die Spalten der passiven Leiter werden durch die induzierten ersetzt
+        currents = np.array(currents, dtype=complex)
+        currents[..., self.passive] = self.solve(currents[..., self.active])
+        return currents
+
+    def apply(self, conductor_set: ConductorSet) -> ConductorSet:
+        # Leitertabelle mit Effektivwert und Phasenlage der induzierten Ströme in den passiven Leitern,
+        # das Ergebnis geht direkt in biot_savart.calculate_field_conductor_set
+        data = conductor_set.data.copy()
+        currents = self.complete_currents(data['I_rms'] * np.exp(1j * data['shift']))
+        data['I_rms'][self.passive] = np.abs(currents[self.passive])
+        data['shift'][self.passive] = np.angle(currents[self.passive])
+        return ConductorSet(data, conductor_set.alpha_rad, conductor_set.L_calc)
+
+
+def _get_factorization(key: str, assemble: Any, cache: KernelCache | None) -> tuple[np.ndarray, np.ndarray]:
+    # LU-Zerlegung von Z_pp; im Cache liegen Matrix und Pivots getrennt, fehlt einer der Einträge wird neu zerlegt
+    if cache is not None:
+        lu, piv = cache.lookup(("lu", key)), cache.lookup(("piv", key))
+        if lu is not None and piv is not None:
+            return lu, piv
+    lu, piv = lu_factor(assemble())
+    if cache is not None:
+        cache.put(("lu", key), lu)
+        cache.put(("piv", key), piv)
+    return lu, piv
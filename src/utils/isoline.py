@@ -0,0 +1,288 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.utils import biot_savart
+from src.utils.conductors import ConductorPath
+from src.utils.slice_stack import PlaneStack
+
+# Grenzwert in µT, dessen Isolinie verfolgt wird
+DEFAULT_LEVEL = 1.0
+
+# Geforderte Lagegenauigkeit der Isolinie in m
+DEFAULT_TOL = 0.01
+
+
+@dataclass
+class Isoline:
+    """
+    Verfolgte Isolinie in Ebenenkoordinaten.
+
+    Attributes:
+        points: Polylinie der Form (N, 2), jeder Punkt liegt höchstens tol/2 neben der Isolinie
+        closed: Isolinie geschlossen (letzter Punkt = erster Punkt), sonst verlässt sie den Bereich
+        n_evaluations: Anzahl Feldauswertungen
+    """
+    points: np.ndarray
+    closed: bool
+    n_evaluations: int
+
+
+class _CountingField:
+    # Zählt die Feldauswertungen und liefert log(B / level), die Nullstelle ist die Isolinie
+    def __init__(self, field_fn: Callable[[np.ndarray], np.ndarray], level: float) -> None:
+        self.field_fn = field_fn
+        self.level = level
+        self.n_evaluations = 0
+
+    def __call__(self, points: np.ndarray) -> np.ndarray:
+        self.n_evaluations += len(points)
+        with np.errstate(divide='ignore'):
+            return np.log(self.field_fn(points) / self.level)
+
+
+def _solve_bracketed(g: Callable[[np.ndarray, np.ndarray], np.ndarray], lo: np.ndarray, hi: np.ndarray,
+                     g_lo: np.ndarray, g_hi: np.ndarray, tol: float, max_iter: int = 60) -> np.ndarray:
+    """
+    Vektorisierte Nullstellensuche in Klammern [lo, hi] mit Vorzeichenwechsel (Regula falsi mit
+    Bisektion als Rückfall). Zu jedem Schätzwert wird ein zweiter Punkt im Abstand tol/2 ausgewertet,
+    damit die Klammer nahe der Nullstelle in einem Schritt unter tol schrumpft.
+
+    Args:
+        g: Funktion (Strahl-Indizes, Parameter) -> Funktionswerte
+        lo, hi: Klammern je Strahl
+        g_lo, g_hi: Funktionswerte an den Klammern
+        tol: Maximale Klammerbreite
+
+    Returns:
+        Klammermitte je Strahl, Fehler höchstens tol/2
+    """
+    lo, hi, g_lo, g_hi = (np.array(a, dtype=float) for a in (lo, hi, g_lo, g_hi))
+    bisect = np.zeros(len(lo), dtype=bool)
+    for _ in range(max_iter):
+        idx = np.nonzero(hi - lo > tol)[0]
+        if not len(idx):
+            break
+        l, h, gl, gh = lo[idx], hi[idx], g_lo[idx], g_hi[idx]
+        mid = 0.5 * (l + h)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = np.where(bisect[idx], mid, l - gl * (h - l) / (gh - gl))
+        x = np.clip(np.nan_to_num(x, nan=mid), l + 0.25 * tol, h - 0.25 * tol)
+        probe = x + np.where(x < mid, 0.5, -0.5) * tol
+        values = g(np.concatenate([idx, idx]), np.concatenate([x, probe]))
+        width_old = h - l
+        for p, gp in ((x, values[:len(idx)]), (probe, values[len(idx):])):
+            inside = (p > lo[idx]) & (p < hi[idx])
+            to_lo = inside & (np.sign(gp) == np.sign(g_lo[idx]))
+            to_hi = inside & ~to_lo
+            lo[idx] = np.where(to_lo, p, lo[idx])
+            g_lo[idx] = np.where(to_lo, gp, g_lo[idx])
+            hi[idx] = np.where(to_hi, p, hi[idx])
+            g_hi[idx] = np.where(to_hi, gp, g_hi[idx])
+        bisect[idx] = hi[idx] - lo[idx] > 0.5 * width_old
+    return 0.5 * (lo + hi)
+
+
+def find_ray_crossings(field_fn: Callable[[np.ndarray], np.ndarray], origins: np.ndarray, directions: np.ndarray,
+                       level: float = DEFAULT_LEVEL, s_max: float = 500.0, s_min: float = 0.1,
+                       n_bracket: int = 24, tol: float = DEFAULT_TOL) -> np.ndarray:
+    """
+    Sucht je Strahl den äussersten Abstand, in dem B den Wert level unterschreitet.
+    Die Klammerung erfolgt auf logarithmisch verteilten Abständen in einem Aufruf von field_fn,
+    danach eine gemeinsame Nullstellensuche für alle Strahlen.
+
+    Args:
+        field_fn: Funktion Punkte (N, D) -> B in µT (N,)
+        origins: Startpunkte der Strahlen (R, D), z.B. Leiterachse
+        directions: Richtungen der Strahlen (R, D), werden normiert
+        level: Grenzwert in µT
+        s_max: Maximaler Abstand [m]
+        s_min: Minimaler Abstand [m]
+        n_bracket: Anzahl Abstände der Klammerung
+        tol: Genauigkeit des Abstands [m]
+
+    Returns:
+        Abstände (R,), NaN wenn innerhalb [s_min, s_max] kein Übergang liegt
+    """
+    origins = np.atleast_2d(np.asarray(origins, dtype=float))
+    directions = np.atleast_2d(np.asarray(directions, dtype=float))
+    directions = directions / np.linalg.norm(directions, axis=1, keepdims=True)
+    g_field = field_fn if isinstance(field_fn, _CountingField) else _CountingField(field_fn, level)
+
+    def g(idx: np.ndarray, s: np.ndarray) -> np.ndarray:
+        return g_field(origins[idx] + s[:, None] * directions[idx])
+
+    n_rays = len(origins)
+    s_samples = np.geomspace(s_min, s_max, n_bracket)
+    rays = np.repeat(np.arange(n_rays), n_bracket)
+    g_samples = g(rays, np.tile(s_samples, n_rays)).reshape(n_rays, n_bracket)
+
+    # Äusserster Übergang von B >= level nach B < level
+    falling = (g_samples[:, :-1] >= 0) & (g_samples[:, 1:] < 0)
+    found = falling.any(axis=1)
+    k = n_bracket - 2 - np.argmax(falling[:, ::-1], axis=1)
+    rows = np.arange(n_rays)
+    distances = np.full(n_rays, np.nan)
+    if found.any():
+        k, rows = k[found], rows[found]
+        distances[found] = _solve_bracketed(lambda idx, s: g(rows[idx], s), s_samples[k], s_samples[k + 1],
+                                            g_samples[rows, k], g_samples[rows, k + 1], tol)
+    return distances
+
+
+def _get_gradient(g: _CountingField, p: np.ndarray, h: float) -> np.ndarray:
+    # Gradient von log(B) in der Ebene mit zentralen Differenzen (ein Aufruf)
+    offsets = np.array([[h, 0.0], [-h, 0.0], [0.0, h], [0.0, -h]])
+    values = g(p + offsets)
+    return np.array([values[0] - values[1], values[2] - values[3]]) / (2 * h)
+
+
+def _correct(g: _CountingField, q: np.ndarray, normal: np.ndarray, width: float, tol: float,
+             n_expand: int = 0) -> float | None:
+    # Korrektor: Nullstelle entlang der Normalen durch den Prädiktorpunkt q in [-width, width], None ohne Klammer
+    for _ in range(n_expand + 1):
+        g_ends = g(q + np.array([-width, width])[:, None] * normal)
+        if np.sign(g_ends[0]) != np.sign(g_ends[1]):
+            s = _solve_bracketed(lambda idx, s: g(q + s[:, None] * normal), np.array([-width]), np.array([width]),
+                                 g_ends[:1], g_ends[1:], tol)
+            return float(s[0])
+        width *= 2
+    return None
+
+
+def trace_isoline(field_fn: Callable[[np.ndarray], np.ndarray], start: np.ndarray, bounds: list[tuple[float, float]],
+                  level: float = DEFAULT_LEVEL, step: float = 10.0, tol: float = DEFAULT_TOL,
+                  max_points: int = 2000) -> Isoline:
+    """
+    Verfolgt die Isolinie B = level durch den Punkt start mit Prädiktor-Korrektor-Schritten:
+    Prädiktor entlang der Tangente, Korrektor als Nullstellensuche entlang der Normalen.
+    Die Schrittweite wird so gewählt, dass die Sehne zwischen zwei Punkten höchstens tol von der
+    Isolinie abweicht (Punktfehler tol/2 plus Pfeilhöhe ~ Korrekturweg / 4).
+    Offene Isolinien werden in beide Richtungen bis zum Rand verfolgt.
+
+    Args:
+        field_fn: Funktion Ebenenpunkte (N, 2) -> B in µT (N,)
+        start: Punkt auf oder nahe der Isolinie, z.B. aus find_ray_crossings
+        bounds: Bereich je Ebenenachse
+        level: Grenzwert in µT
+        step: Anfängliche und maximale Schrittweite [m]
+        tol: Geforderte Genauigkeit [m]
+        max_points: Maximale Anzahl Punkte je Richtung
+
+    Returns:
+        Isoline mit Polylinie und Anzahl Feldauswertungen
+    """
+    g = _CountingField(field_fn, level)
+    lower, upper = np.array(bounds, dtype=float).T
+    h = max(tol, 1e-3 * step)
+    min_step = 2 * tol
+
+    # Startpunkt auf die Isolinie ziehen
+    start = np.asarray(start, dtype=float)
+    grad = _get_gradient(g, start, h)
+    s = _correct(g, start, grad / np.linalg.norm(grad), step, tol, n_expand=4)
+    if s is None:
+        raise ValueError(f"Keine Isolinie {level} µT in der Nähe des Startpunkts gefunden")
+    start = start + s * grad / np.linalg.norm(grad)
+
+    branches = []
+    for orientation in (1.0, -1.0):
+        points, p, tangent_old, dl = [start], start, None, step
+        closed = False
+        normal = None
+        while len(points) < max_points:
+            if normal is None:
+                # Tangente und Normale nur nach einem angenommenen Schritt neu bestimmen
+                grad = _get_gradient(g, p, h)
+                normal = grad / np.linalg.norm(grad)
+                tangent = orientation * np.array([-normal[1], normal[0]])
+                if tangent_old is not None and tangent @ tangent_old < 0:
+                    tangent = -tangent
+            # Klammer nur im zulässigen Korrekturweg, beim kleinsten Schritt wird sie erweitert
+            s = _correct(g, p + dl * tangent, normal, 2 * tol, tol, n_expand=0 if dl > min_step else 8)
+            if s is None and dl > min_step:
+                # Pfeilhöhe zu gross: Schritt halbieren
+                dl *= 0.5
+                continue
+            if s is None:
+                break
+            p_new = p + dl * tangent + s * normal
+            if np.any(p_new < lower) or np.any(p_new > upper):
+                break
+            points.append(p_new)
+            tangent_old, p, normal = tangent, p_new, None
+            if abs(s) < tol:
+                dl = min(1.5 * dl, step)
+            if len(points) > 3 and np.linalg.norm(p - start) < dl:
+                points.append(start)
+                closed = True
+                break
+        if closed:
+            return Isoline(np.array(points), True, g.n_evaluations)
+        branches.append(points)
+    return Isoline(np.array(branches[1][::-1] + branches[0][1:]), False, g.n_evaluations)
+
+
+def get_plane_field_fn(plane: PlaneStack, paths: list[ConductorPath], I_rms: float, f: float,
+                       r_wire: float = biot_savart.R_WIRE,
+                       mu_0: float = biot_savart.MU_0) -> Callable[[np.ndarray], np.ndarray]:
+    # Feld in µT auf der ersten Ebene des Stapels als Funktion der Ebenenkoordinaten (N, 2)
+    origin, u_axis, v_axis = plane.origins[0], plane.u_axes[0], plane.v_axes[0]
+
+    def field_fn(params: np.ndarray) -> np.ndarray:
+        points = origin + params[:, :1] * u_axis + params[:, 1:] * v_axis
+        return biot_savart.calculate_rms_chunked(points, paths, I_rms, f, r_wire, mu_0) * 1e6
+
+    return field_fn
+
+
+def trace_plane_isoline(plane: PlaneStack, paths: list[ConductorPath], I_rms: float, f: float,
+                        bounds: list[tuple[float, float]], ray_origin: tuple[float, float] = (0.0, 0.0),
+                        ray_direction: tuple[float, float] = (1.0, 0.0), level: float = DEFAULT_LEVEL,
+                        step: float = 10.0, tol: float = DEFAULT_TOL, r_wire: float = biot_savart.R_WIRE,
+                        mu_0: float = biot_savart.MU_0) -> Isoline:
+    """
+    Isolinie in einer Schnittebene ohne vollständiges Gitter: Startpunkt als äusserster Übergang
+    entlang eines Strahls ab ray_origin, danach Verfolgung mit trace_isoline.
+    Verfolgt wird nur der Zweig der Isolinie durch diesen Startpunkt.
+    """
+    g = _CountingField(get_plane_field_fn(plane, paths, I_rms, f, r_wire, mu_0), level)
+    s_max = float(np.max(np.abs(np.array(bounds) - np.asarray(ray_origin)[:, None])))
+    s = find_ray_crossings(g, ray_origin, ray_direction, level, s_max=s_max, tol=tol)[0]
+    if np.isnan(s):
+        raise ValueError(f"Strahl ab {ray_origin} schneidet die Isolinie {level} µT nicht")
+    direction = np.asarray(ray_direction, dtype=float) / np.linalg.norm(ray_direction)
+    isoline = trace_isoline(g.field_fn, np.asarray(ray_origin) + s * direction, bounds, level, step, tol)
+    isoline.n_evaluations += g.n_evaluations
+    return isoline
+
+
+def get_compliance_distances(plane: PlaneStack, paths: list[ConductorPath], I_rms: float, f: float,
+                             axis_u: float = 0.0, height: float = 1.0, level: float = DEFAULT_LEVEL,
+                             s_max: float = 500.0, tol: float = DEFAULT_TOL, r_wire: float = biot_savart.R_WIRE,
+                             mu_0: float = biot_savart.MU_0) -> tuple[float, float]:
+    """
+    Abstand der Isolinie B = level von der Leitungsachse auf einer Höhe, z.B. 1 µT auf 1 m Höhe in
+    einem Frontschnitt (U quer zur Leitung, V = Höhe).
+
+    Args:
+        plane: Schnittebene, z.B. aus get_front_slice_planes
+        paths: Leiterverläufe mit Phasenlage 'shift'
+        I_rms: Effektivwert des Leiterstroms [A]
+        f: Frequenz [Hz]
+        axis_u: Lage der Leitungsachse in der Ebene [m]
+        height: Höhe V der Auswertung [m]
+        level: Grenzwert in µT
+        s_max: Maximaler Suchabstand [m]
+        tol: Genauigkeit [m]
+        r_wire: Leiterradius [m]
+        mu_0: Magnetische Feldkonstante [Vs/Am]
+
+    Returns:
+        Abstände zur Achse auf der Seite -U und +U in m, NaN ohne Übergang
+    """
+    field_fn = get_plane_field_fn(plane, paths, I_rms, f, r_wire, mu_0)
+    origins = np.array([[axis_u, height], [axis_u, height]])
+    left, right = find_ray_crossings(field_fn, origins, [[-1.0, 0.0], [1.0, 0.0]], level, s_max=s_max, tol=tol)
+    return float(left), float(right)
@@ -0,0 +1,107 @@
+import hashlib
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+import numpy as np
+
+# Standardbudget für zwischengespeicherte Einheitsstrom-Felder
+DEFAULT_MAX_BYTES = 512 * 1024**2
+
+
+def fingerprint_arrays(*arrays: np.ndarray | float) -> str:
+    """
+    Erzeugt einen Fingerabdruck über Inhalt, Form und Datentyp der übergebenen Arrays bzw. Zahlen.
+
+    Args:
+        arrays: Gitter, Segmentpunkte oder Parameter, die den Schlüssel bestimmen
+
+    Returns:
+        Hex-String des Hashes
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for arr in arrays:
+        a = np.ascontiguousarray(arr)
+        h.update(str(a.shape).encode())
+        h.update(a.dtype.str.encode())
+        h.update(a.tobytes())
+    return h.hexdigest()
+
+
+class KernelCache:
+    """
+    LRU-Cache für Einheitsstrom-Felder je (Gitter, Segment) mit begrenztem Speicherbudget.
+    Die Geometrie wird einmal berechnet, Ströme und Phasenlagen werden danach nur noch linear kombiniert.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """
+        Initialisiert den Cache.
+
+        Args:
+            max_bytes: Maximaler Speicherbedarf aller Einträge in Bytes
+        """
+        self.max_bytes: int = max_bytes
+        self.current_bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[Hashable, np.ndarray] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def lookup(self, key: Hashable) -> np.ndarray | None:
+        # Liefert den Eintrag oder None und markiert ihn als zuletzt verwendet
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, entry: np.ndarray) -> np.ndarray:
+        """
+        Speichert einen Eintrag und verdrängt bei Bedarf die ältesten Einträge.
+        Einträge über dem Gesamtbudget werden nicht gespeichert.
+
+        Returns:
+            Eintrag (schreibgeschützt)
+        """
+        entry.setflags(write=False)
+        if entry.nbytes <= self.max_bytes:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old.nbytes
+            self._entries[key] = entry
+            self.current_bytes += entry.nbytes
+            self._evict()
+        return entry
+
+    def get(self, key: Hashable, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Liefert den Eintrag zum Schlüssel oder berechnet und speichert ihn.
+
+        Args:
+            key: Schlüssel aus Gitter- und Segment-Fingerabdruck
+            compute: Funktion, die das Einheitsstrom-Feld berechnet
+
+        Returns:
+            Einheitsstrom-Feld (schreibgeschützt)
+        """
+        entry = self.lookup(key)
+        if entry is None:
+            entry = self.put(key, compute())
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def _evict(self) -> None:
+        # Älteste Einträge entfernen, bis das Budget eingehalten ist
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, old = self._entries.popitem(last=False)
+            self.current_bytes -= old.nbytes
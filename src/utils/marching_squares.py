@@ -0,0 +1,162 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.utils.biot_savart import CONTOUR_LEVELS
+
+
+@dataclass
+class ContourLine:
+    """
+    Isolinie eines Gitters.
+
+    Attributes:
+        level: Wert der Isolinie, z.B. in µT
+        points: Polylinie der Form (N, 2) in den Koordinaten des Gitters (x, y)
+        closed: Geschlossen (letzter Punkt = erster Punkt), sonst endet sie am Rand oder an fehlenden Werten
+    """
+    level: float
+    points: np.ndarray
+    closed: bool
+
+
+def _build_segment_table() -> np.ndarray:
+    # Segmente je Zelle für Fall (Bitmaske der Ecken >= level) und Zellmitte >= level als Kantenpaare (von, nach).
+    # Ecken gegen den Uhrzeigersinn: v0 (i, j), v1 (i, j+1), v2 (i+1, j+1), v3 (i+1, j); Kante k verbindet
+    # v_k mit v_k+1. Jedes Segment läuft von einer Austritts- zu einer Eintrittskante, der Bereich >= level
+    # liegt damit immer links; eine Kante ist in der einen Nachbarzelle Austritt, in der anderen Eintritt.
+    table = np.full((16, 2, 2, 2), -1, dtype=np.int64)
+    for case in range(16):
+        above = [(case >> c) & 1 for c in range(4)]
+        exits = [k for k in range(4) if above[k] and not above[(k + 1) % 4]]
+        entries = [k for k in range(4) if not above[k] and above[(k + 1) % 4]]
+        for center in (0, 1):
+            for n, k in enumerate(exits):
+                # Sattel: Mitte oben verbindet die oberen Ecken (nächste Eintrittskante), sonst trennt sie sie
+                table[case, center, n] = (k, min(entries, key=lambda e: (e - k) % 4 if center else (k - e) % 4))
+    return table
+
+
+_SEGMENT_TABLE = _build_segment_table()
+
+
+def extract_contours(x: np.ndarray, y: np.ndarray, z: np.ndarray,
+                     levels: float | Sequence[float] | np.ndarray = CONTOUR_LEVELS) -> list[ContourLine]:
+    """
+    Isolinien aller Werte mit Marching Squares, vektorisiert über Zellen und Werte. Die Kreuzungen werden
+    linear auf den Zellkanten interpoliert, Sattelzellen über den Mittelwert der vier Ecken aufgelöst und
+    die Segmente zu offenen bzw. geschlossenen Polylinien verkettet. Zellen mit NaN werden übersprungen.
+
+    Args:
+        x, y: Koordinaten als Achsvektoren (nx,) und (ny,) oder als Gitter der Form von z, z.B. lon/lat
+        z: Werte der Form (ny, nx), z.B. B in µT
+        levels: Wert oder Werte der Isolinien, standardmässig biot_savart.CONTOUR_LEVELS
+
+    Returns:
+        Isolinien, aufsteigend nach Wert
+    """
+    z = np.asarray(z, dtype=float)
+    ny, nx = z.shape
+    if np.ndim(x) == 1:
+        x, y = np.meshgrid(x, y)
+    x, y = np.broadcast_to(x, z.shape).ravel(), np.broadcast_to(y, z.shape).ravel()
+    levels = np.atleast_1d(np.asarray(levels, dtype=float))
+    if ny < 2 or nx < 2 or len(levels) == 0:
+        return []
+
+    # Kantennummern: waagrechte Kanten (i, j)-(i, j+1), danach senkrechte (i, j)-(i+1, j), je Wert versetzt
+    n_horizontal = ny * (nx - 1)
+    n_edges = n_horizontal + (ny - 1) * nx
+
+    above = (z >= levels[:, None, None]).view(np.uint8)
+    case = above[:, :-1, :-1] | above[:, :-1, 1:] << 1 | above[:, 1:, 1:] << 2 | above[:, 1:, :-1] << 3
+    corners = np.stack([z[:-1, :-1], z[:-1, 1:], z[1:, 1:], z[1:, :-1]])
+    valid = np.all(np.isfinite(corners), axis=0)
+
+    l, i, j = np.nonzero((case > 0) & (case < 15) & valid)
+    center = corners.mean(axis=0)[i, j] >= levels[l]
+    cell_edges = np.stack([i * (nx - 1) + j, n_horizontal + i * nx + j + 1, (i + 1) * (nx - 1) + j,
+                           n_horizontal + i * nx + j], axis=1) + (l * n_edges)[:, None]
+    segments = _SEGMENT_TABLE[case[l, i, j], center.astype(np.int64)]
+    cell, n = np.nonzero(segments[:, :, 0] >= 0)
+    starts = cell_edges[cell, segments[cell, n, 0]]
+    ends = cell_edges[cell, segments[cell, n, 1]]
+
+    # Kreuzungen kompakt numerieren; jede hat höchstens einen Nachfolger und einen Vorgänger
+    edges = np.unique(np.concatenate([starts, ends]))
+    starts, ends = np.searchsorted(edges, starts), np.searchsorted(edges, ends)
+    successor = np.full(len(edges), -1, dtype=np.int64)
+    successor[starts] = ends
+    has_predecessor = np.zeros(len(edges), dtype=bool)
+    has_predecessor[ends] = True
+
+    # Offene Linien beginnen an Kreuzungen ohne Vorgänger, alle übrigen Segmente bilden geschlossene Ringe
+    open_starts = starts[~has_predecessor[starts]]
+    chains, nodes = _walk(successor, open_starts, closed=False)
+    visited = np.zeros(len(edges), dtype=bool)
+    visited[nodes] = True
+    ring_starts = _get_ring_representatives(successor, starts[~visited[starts]])
+    ring_chains, ring_nodes = _walk(successor, ring_starts, closed=True)
+    chains = np.concatenate([chains, ring_chains + len(open_starts)])
+    nodes = edges[np.concatenate([nodes, ring_nodes])]
+
+    order = np.argsort(chains, kind='stable')
+    nodes = nodes[order]
+    counts = np.bincount(chains, minlength=len(open_starts) + len(ring_starts))
+    points = _get_crossings(nodes, levels, n_edges, n_horizontal, nx, x, y, z)
+
+    lines = []
+    first = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    for c, (i0, count) in enumerate(zip(first, counts)):
+        closed = c >= len(open_starts)
+        line = points[i0:i0 + count]
+        if closed:
+            line = np.vstack([line, line[:1]])
+        lines.append(ContourLine(float(levels[nodes[i0] // n_edges]), line, closed))
+    lines.sort(key=lambda line: line.level)
+    return lines
+
+
+def _walk(successor: np.ndarray, starts: np.ndarray, closed: bool) -> tuple[np.ndarray, np.ndarray]:
+    # Alle Linien gleichzeitig verfolgen; liefert (Liniennummer, Kreuzung) in Reihenfolge der Schritte
+    chain = np.arange(len(starts))
+    current = starts
+    chains, nodes = [], []
+    while len(current):
+        chains.append(chain)
+        nodes.append(current)
+        current = successor[current]
+        keep = current >= 0
+        if closed:
+            keep &= current != starts[chain]
+        current, chain = current[keep], chain[keep]
+    if not chains:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(chains), np.concatenate(nodes)
+
+
+def _get_ring_representatives(successor: np.ndarray, members: np.ndarray) -> np.ndarray:
+    # Kleinste Nummer je Ring durch Zeigerverdopplung, log2(Ringlänge) Schritte
+    if len(members) == 0:
+        return members
+    label = np.zeros(len(successor), dtype=np.int64)
+    label[members] = members
+    jump = successor.copy()
+    for _ in range(int(np.ceil(np.log2(len(members) + 1)))):
+        label[members] = np.minimum(label[members], label[jump[members]])
+        jump[members] = jump[jump[members]]
+    return members[label[members] == members]
+
+
+def _get_crossings(nodes: np.ndarray, levels: np.ndarray, n_edges: int, n_horizontal: int, nx: int,
+                   x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    # Lineare Interpolation der Kreuzung auf der Kante zwischen den Gitterpunkten a und b
+    level = levels[nodes // n_edges]
+    edge = nodes % n_edges
+    horizontal = edge < n_horizontal
+    a = np.where(horizontal, edge // (nx - 1) * nx + edge % (nx - 1), edge - n_horizontal)
+    b = np.where(horizontal, a + 1, a + nx)
+    z_flat = z.ravel()
+    t = (level - z_flat[a]) / (z_flat[b] - z_flat[a])
+    return np.stack([x[a] + t * (x[b] - x[a]), y[a] + t * (y[b] - y[a])], axis=1)
@@ -0,0 +1,115 @@
+import itertools
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.utils import biot_savart
+from src.utils.conductors import THREE_PHASE_SHIFTS
+from src.utils.scenarios import ScenarioSweep
+
+# Bezeichnungen der Phasenlagen THREE_PHASE_SHIFTS eines Drehstromsystems
+PHASE_NAMES = ("L1", "L2", "L3")
+
+OBJECTIVES = ("peak", "zone_width")
+
+
+@dataclass
+class Arrangement:
+    """
+    Bewertete Phasenbelegung.
+
+    Attributes:
+        label: Belegung je System, z.B. 'L1-L2-L3 / L3-L2-L1'
+        shifts: Phasenlagen je Leiter (C,) in rad
+        peak: Maximaler Effektivwert von B auf den Aufpunkten in µT
+        zone_width: Breite der Zone mit B >= level entlang des Transekts in m (NaN ohne Transekt)
+    """
+    label: str
+    shifts: np.ndarray
+    peak: float
+    zone_width: float
+
+
+def get_phase_arrangements(circuits: list[list[int]], fix_first: bool = True) -> tuple[np.ndarray, list[str]]:
+    """
+    Alle Phasenbelegungen der Systeme. Der Effektivwert ändert sich weder bei einer gemeinsamen Drehung
+    aller Phasen noch bei Umkehr aller Drehrichtungen, daher genügt es, das erste System festzuhalten.
+
+    Args:
+        circuits: Leiter-Indizes je Drehstromsystem, z.B. [[0, 1, 2], [3, 4, 5]]
+        fix_first: Erstes System als L1-L2-L3 festhalten
+
+    Returns:
+        Phasenlagen der Form (Belegungen, C) und Bezeichnungen
+    """
+    n_conductors = max(i for circuit in circuits for i in circuit) + 1
+    per_circuit = [[(0, 1, 2)] if fix_first and k == 0 else list(itertools.permutations(range(3)))
+                   for k in range(len(circuits))]
+    shifts, labels = [], []
+    for combination in itertools.product(*per_circuit):
+        row = np.zeros(n_conductors)
+        for circuit, order in zip(circuits, combination):
+            row[circuit] = np.take(THREE_PHASE_SHIFTS, order)
+        shifts.append(row)
+        labels.append(" / ".join("-".join(PHASE_NAMES[i] for i in order) for order in combination))
+    return np.array(shifts), labels
+
+
+def get_zone_widths(B: np.ndarray, s: np.ndarray, level: float = 1.0) -> np.ndarray:
+    """
+    Breite der Zone B >= level entlang eines Transekts, Ränder linear interpoliert.
+
+    Args:
+        B: Effektivwerte in µT der Form (N, P) entlang des Transekts
+        s: Lage der Punkte entlang des Transekts (P,), aufsteigend [m]
+        level: Grenzwert in µT
+
+    Returns:
+        Zonenbreiten (N,) in m, 0 ohne Überschreitung
+    """
+    rows = np.arange(len(B))
+    above = B >= level
+    first = np.argmax(above, axis=1)
+    last = B.shape[1] - 1 - np.argmax(above[:, ::-1], axis=1)
+
+    def edge(inner: np.ndarray, outer: np.ndarray) -> np.ndarray:
+        # Übergang zwischen dem äussersten Punkt über und dem ersten Punkt unter dem Grenzwert
+        B_in, B_out = B[rows, inner], B[rows, outer]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.where(inner == outer, 0.0, (B_in - level) / (B_in - B_out))
+        return s[inner] + t * (s[outer] - s[inner])
+
+    left = edge(first, np.maximum(first - 1, 0))
+    right = edge(last, np.minimum(last + 1, B.shape[1] - 1))
+    return np.where(above.any(axis=1), right - left, 0.0)
+
+
+def optimize_phase_arrangement(sweep: ScenarioSweep, circuits: list[list[int]], I_rms: float | np.ndarray,
+                               objective: str = "peak", s: np.ndarray | None = None,
+                               level: float = 1.0) -> list[Arrangement]:
+    """
+    Bewertet alle Phasenbelegungen mit den zwischengespeicherten Einheitsstrom-Feldern der Leiter,
+    jede Belegung kostet nur eine Linearkombination.
+
+    Args:
+        sweep: ScenarioSweep auf den Aufpunkten, z.B. ein Transekt quer zur Leitung auf 1 m Höhe
+        circuits: Leiter-Indizes je Drehstromsystem
+        I_rms: Effektivwert des Leiterstroms [A], Skalar oder je Leiter (C,)
+        objective: "peak" (maximales B) oder "zone_width" (Breite der Zone B >= level, benötigt s)
+        s: Lage der Aufpunkte entlang des Transekts [m], nur für eindimensionale Aufpunkte
+        level: Grenzwert in µT
+
+    Returns:
+        Belegungen, aufsteigend nach dem Zielkriterium sortiert
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unbekanntes Zielkriterium '{objective}', erlaubt sind: {', '.join(OBJECTIVES)}")
+    if objective == "zone_width" and s is None:
+        raise ValueError("Für das Zielkriterium 'zone_width' wird die Lage s der Aufpunkte benötigt")
+
+    shifts, labels = get_phase_arrangements(circuits)
+    B = sweep.calculate_rms(biot_savart.get_phase_current_phasor(np.asarray(I_rms), shifts)).reshape(len(shifts), -1)
+    peaks = B.max(axis=1)
+    widths = get_zone_widths(B, np.asarray(s, dtype=float), level) if s is not None else np.full(len(B), np.nan)
+    order = np.argsort(peaks if objective == "peak" else widths, kind="stable")
+    return [Arrangement(labels[i], shifts[i], float(peaks[i]), float(widths[i])) for i in order]
@@ -0,0 +1,192 @@
+import dataclasses
+import hashlib
+import os
+import shutil
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.utils import biot_savart
+
+# Standardverzeichnis und Speicherbudget des Ergebnis-Caches auf der Festplatte
+DEFAULT_CACHE_DIRECTORY = ".field_cache"
+DEFAULT_MAX_DISK_BYTES = 2 * 1024**3
+
+ENTRY_SUFFIX = ".npy"
+
+
+def fingerprint_inputs(*inputs: Any) -> str:
+    """
+    Fingerabdruck beliebig verschachtelter Eingaben: Arrays (Inhalt, Form, Datentyp), Zahlen, Texte,
+    Listen, Tupel, Dictionaries (nach Schlüssel sortiert) und Dataclasses wie ConductorPath oder ConductorSet.
+
+    Args:
+        inputs: Ströme, Phasenlagen, Geometrie, Gitter und weitere Parameter
+
+    Returns:
+        Hex-String des Hashes
+    """
+    h = hashlib.blake2b(digest_size=20)
+
+    def update(obj: Any) -> None:
+        # Typkennung vor jedem Wert, damit z.B. [1, 2] und (1, 2) oder 1 und 1.0 verschieden bleiben
+        h.update(type(obj).__name__.encode())
+        if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            update({field.name: getattr(obj, field.name) for field in dataclasses.fields(obj)})
+        elif isinstance(obj, dict):
+            h.update(str(len(obj)).encode())
+            for key in sorted(obj, key=str):
+                update(str(key))
+                update(obj[key])
+        elif isinstance(obj, (list, tuple)):
+            h.update(str(len(obj)).encode())
+            for item in obj:
+                update(item)
+        elif isinstance(obj, (np.ndarray, np.generic)):
+            a = np.ascontiguousarray(obj)
+            h.update(str(a.shape).encode())
+            h.update(a.dtype.str.encode())
+            h.update(a.tobytes())
+        else:
+            h.update(repr(obj).encode())
+
+    for item in inputs:
+        update(item)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Inhaltsadressierter Ergebnis-Cache auf der Festplatte. Jedes Ergebnis liegt als .npy-Datei unter dem
+    Fingerabdruck aller Eingaben und wird schreibgeschützt als Memory-Map geöffnet, ein erneuter Start lädt
+    damit nur die tatsächlich gelesenen Seiten. Die Einträge liegen je KERNEL_VERSION in einem eigenen
+    Unterverzeichnis, ältere Versionen werden beim Öffnen verworfen. Die Dateizeit dient als LRU-Reihenfolge,
+    über max_bytes werden die am längsten nicht verwendeten Einträge gelöscht.
+    """
+
+    def __init__(self, directory: str | Path = DEFAULT_CACHE_DIRECTORY, max_bytes: int = DEFAULT_MAX_DISK_BYTES,
+                 version: int | str = biot_savart.KERNEL_VERSION) -> None:
+        """
+        Öffnet bzw. erstellt das Cache-Verzeichnis.
+
+        Args:
+            directory: Basisverzeichnis des Caches
+            max_bytes: Maximaler Platzbedarf aller Einträge in Bytes
+            version: Version der Feldberechnung, Einträge anderer Versionen werden gelöscht
+        """
+        self.base: Path = Path(directory)
+        self.directory: Path = self.base / f"v{version}"
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for other in self.base.iterdir():
+            if other.is_dir() and other != self.directory and other.name.startswith("v"):
+                shutil.rmtree(other, ignore_errors=True)
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def __contains__(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def lookup(self, key: str) -> np.ndarray | None:
+        # Liefert den Eintrag als schreibgeschützte Memory-Map oder None und markiert ihn als zuletzt verwendet
+        path = self._path(key)
+        try:
+            entry = np.load(path, mmap_mode='r', allow_pickle=False)
+            os.utime(path)
+        except (FileNotFoundError, ValueError, OSError):
+            # Fehlend oder unvollständig (z.B. Abbruch eines anderen Prozesses): wie nicht vorhanden behandeln
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: np.ndarray) -> np.ndarray:
+        """
+        Speichert einen Eintrag atomar (temporäre Datei, danach umbenennen) und verdrängt bei Bedarf die
+        ältesten Einträge. Einträge über dem Gesamtbudget werden nicht gespeichert.
+
+        Returns:
+            Eintrag als Memory-Map bzw. unverändert, wenn er nicht gespeichert wurde
+        """
+        entry = np.asarray(entry)
+        if entry.nbytes > self.max_bytes:
+            return entry
+        fd, temp_name = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                np.save(file, entry, allow_pickle=False)
+            os.replace(temp_name, self._path(key))
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+        self._evict()
+        try:
+            return np.load(self._path(key), mmap_mode='r', allow_pickle=False)
+        except FileNotFoundError:
+            return entry
+
+    def get(self, key: str, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Liefert den Eintrag zum Schlüssel oder berechnet und speichert ihn.
+
+        Args:
+            key: Fingerabdruck aus fingerprint_inputs
+            compute: Funktion, die das Ergebnis berechnet
+
+        Returns:
+            Ergebnis (schreibgeschützte Memory-Map)
+        """
+        entry = self.lookup(key)
+        if entry is None:
+            entry = self.put(key, compute())
+        return entry
+
+    def cached(self, name: str, inputs: Any, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        # Kurzform: Schlüssel aus Bezeichnung und allen Eingaben, z.B. cached("B3D", (phases, I_rms, X3), ...)
+        return self.get(fingerprint_inputs(name, inputs), compute)
+
+    @property
+    def current_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self._entries())
+
+    def clear(self) -> None:
+        for path in self._entries():
+            _remove(path)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{ENTRY_SUFFIX}"
+
+    def _entries(self) -> list[Path]:
+        return list(self.directory.glob(f"*{ENTRY_SUFFIX}"))
+
+    def _evict(self) -> None:
+        # Älteste Einträge (Dateizeit) entfernen, bis das Budget eingehalten ist
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if _remove(path):
+                total -= size
+
+
+def _remove(path: Path) -> bool:
+    # Eintrag löschen; unter Windows schlägt das fehl, solange eine Memory-Map offen ist, der Eintrag bleibt dann
+    try:
+        path.unlink(missing_ok=True)
+        return True
+    except PermissionError:
+        return False
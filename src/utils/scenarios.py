@@ -0,0 +1,118 @@
+import itertools
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from src.utils import biot_savart
+from src.utils.conductors import ConductorPath
+from src.utils.kernel_cache import KernelCache
+
+
+@dataclass
+class ScenarioSet:
+    """
+    Betriebszustände als Ströme und Phasenlagen je Leiter.
+
+    Attributes:
+        I_rms: Effektivwerte der Leiterströme der Form (N, C) in A
+        shifts: Phasenlagen der Leiterströme der Form (N, C) in rad
+        names: Optionale Bezeichnungen der Szenarien
+    """
+    I_rms: np.ndarray
+    shifts: np.ndarray
+    names: list[str] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        I_rms, shifts = np.broadcast_arrays(np.atleast_2d(np.asarray(self.I_rms, dtype=float)),
+                                            np.atleast_2d(np.asarray(self.shifts, dtype=float)))
+        self.I_rms, self.shifts = I_rms.copy(), shifts.copy()
+        if self.names and len(self.names) != len(self.I_rms):
+            raise ValueError("Anzahl Bezeichnungen passt nicht zur Anzahl Szenarien")
+
+    def __len__(self) -> int:
+        return len(self.I_rms)
+
+    def get_currents(self) -> np.ndarray:
+        # Komplexe Scheitelwert-Zeiger der Form (N, C)
+        return biot_savart.get_phase_current_phasor(self.I_rms, self.shifts)
+
+    @classmethod
+    def from_product(cls, I_rms: Any, shift_sets: Any, loads: Any = (1.0,)) -> "ScenarioSet":
+        """
+        Alle Kombinationen aus Strömen, Phasenbelegungen und Lastfaktoren.
+
+        Args:
+            I_rms: Ströme je Szenario, Form (K,) für alle Leiter gleich oder (K, C) je Leiter [A]
+            shift_sets: Phasenlagen der Leiter je Belegung, Form (M, C) [rad]
+            loads: Lastfaktoren (L,), skalieren die Ströme
+
+        Returns:
+            ScenarioSet mit K * M * L Szenarien (Lastfaktor läuft am schnellsten)
+        """
+        I_rms = np.asarray(I_rms, dtype=float)
+        shift_sets = np.atleast_2d(np.asarray(shift_sets, dtype=float))
+        I_rms = I_rms[:, None] if I_rms.ndim == 1 else I_rms
+        combinations = list(itertools.product(range(len(I_rms)), range(len(shift_sets)), np.asarray(loads, float)))
+        return cls(np.array([I_rms[k] * load for k, _, load in combinations]),
+                   np.array([shift_sets[m] for _, m, _ in combinations]))
+
+
+class ScenarioSweep:
+    """
+    Szenario-Rechnung über lineare Überlagerung: die Einheitsstrom-Felder der Leiter werden einmal
+    berechnet, jede Menge von Strom-, Phasen- und Lastszenarien danach als Matrixprodukt
+    (Szenarien × Leiter) @ (Leiter × Punkte·3), blockweise über die Punkte.
+    """
+
+    def __init__(self, X: np.ndarray, Y: Any, Z: Any, paths: list[ConductorPath], r_wire: float = biot_savart.R_WIRE,
+                 mu_0: float = biot_savart.MU_0, cache: KernelCache | None = None) -> None:
+        """
+        Berechnet die Einheitsstrom-Felder der Leiter auf dem Gitter.
+
+        Args:
+            X, Y, Z: Koordinaten der Aufpunkte [m], Skalare werden auf die Gitterform gebracht
+            paths: Leiterverläufe, die Phasenlagen der Pfade werden nicht verwendet
+            r_wire: Leiterradius [m]
+            mu_0: Magnetische Feldkonstante [Vs/Am]
+            cache: Optionaler KernelCache für die Einheitsstrom-Felder
+        """
+        points, self.shape = biot_savart.get_points(X, Y, Z)
+        unit_fields = biot_savart.get_path_unit_fields(points, paths, r_wire, mu_0, cache)
+        # Form (C, P, 3): ein Punktblock ist damit als (C, n * 3) ohne Kopie verfügbar
+        self.unit_fields: np.ndarray = np.ascontiguousarray(unit_fields.transpose(0, 2, 1))
+
+    @property
+    def n_conductors(self) -> int:
+        return self.unit_fields.shape[0]
+
+    @property
+    def n_points(self) -> int:
+        return self.unit_fields.shape[1]
+
+    def calculate_rms(self, scenarios: ScenarioSet | np.ndarray,
+                      max_memory: int = biot_savart.DEFAULT_MAX_MEMORY) -> np.ndarray:
+        """
+        Effektivwerte von B für alle Szenarien.
+
+        Args:
+            scenarios: ScenarioSet oder komplexe Scheitelwert-Zeiger der Form (N, C)
+            max_memory: Speicherbudget der Feldzeiger eines Punktblocks in Bytes
+
+        Returns:
+            Effektivwerte von B in µT der Form (N, *Gitterform)
+        """
+        currents = scenarios.get_currents() if isinstance(scenarios, ScenarioSet) else np.atleast_2d(scenarios)
+        if currents.shape[-1] != self.n_conductors:
+            raise ValueError(f"Szenarien mit {currents.shape[-1]} Leitern, Gitter mit {self.n_conductors} Leitern")
+        I_re, I_im = np.ascontiguousarray(currents.real), np.ascontiguousarray(currents.imag)
+
+        # Real- und Imaginärteil als zwei reelle Matrixprodukte, je Szenario und Punkt 2 * 3 Werte
+        chunk_size = max(1, min(self.n_points, max_memory // (6 * len(currents) * 8)))
+        B_rms = np.empty((len(currents), self.n_points))
+        for i0 in range(0, self.n_points, chunk_size):
+            block = self.unit_fields[:, i0:i0 + chunk_size].reshape(self.n_conductors, -1)
+            B_sq = np.square(I_re @ block).reshape(len(currents), -1, 3).sum(axis=2)
+            B_sq += np.square(I_im @ block).reshape(len(currents), -1, 3).sum(axis=2)
+            B_rms[:, i0:i0 + chunk_size] = np.sqrt(B_sq / 2)
+        return B_rms.reshape(len(currents), *self.shape) * 1e6
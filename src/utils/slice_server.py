@@ -0,0 +1,162 @@
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+
+from src.utils import biot_savart, slice_stack
+from src.utils.conductors import Conductors
+from src.utils.kernel_cache import KernelCache
+from src.utils.slice_stack import PlaneStack
+
+# Speicherbudget der zuletzt angezeigten Schnitte und Anzahl vorausberechneter Nachbarn je Richtung
+DEFAULT_SLICE_BYTES = 256 * 1024**2
+DEFAULT_PREFETCH = 2
+
+
+class SliceServer:
+    """
+    Schnitte eines Ebenenstapels auf Abruf: ein Schnitt wird erst berechnet, wenn der Slider ihn anfordert,
+    die Nachbarn werden im Hintergrund vorausberechnet. Die Ergebnisse liegen in einem LRU-Cache mit
+    Speicherbudget, der Start hängt damit weder von der Anzahl Schnitte noch von der Auflösung ab.
+    """
+
+    def __init__(self, planes: PlaneStack, U: np.ndarray, V: np.ndarray, paths: Conductors,
+                 I_rms: float | np.ndarray, f: float, r_wire: float = biot_savart.R_WIRE,
+                 mu_0: float = biot_savart.MU_0, max_bytes: int = DEFAULT_SLICE_BYTES,
+                 prefetch: int = DEFAULT_PREFETCH, workers: int = 1) -> None:
+        """
+        Initialisiert den Server ohne einen Schnitt zu berechnen.
+
+        Args:
+            planes: Schnittebenen, z.B. aus get_front_slice_planes oder get_top_slice_planes
+            U, V: Koordinaten in der Ebene (Gitter) [m]
+            paths: Leiterverläufe mit Phasenlage 'shift' oder Leitertabelle (ConductorSet)
+            I_rms: Effektivwert des Leiterstroms [A], Skalar oder je Leiter (C,)
+            f: Frequenz [Hz]
+            r_wire: Leiterradius [m]
+            mu_0: Magnetische Feldkonstante [Vs/Am]
+            max_bytes: Speicherbudget der zwischengespeicherten Schnitte in Bytes
+            prefetch: Anzahl Nachbarn je Richtung, die nach einer Anfrage vorausberechnet werden
+            workers: Hintergrund-Threads für die Vorausberechnung
+        """
+        self.planes = planes
+        self.U, self.V = U, V
+        self.paths = paths
+        self.I_rms, self.f = I_rms, f
+        self.r_wire, self.mu_0 = r_wire, mu_0
+        self.prefetch = prefetch
+        self.slices = KernelCache(max_bytes)
+        self._lock = threading.Lock()
+        self._pending: dict[int, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="slice-prefetch")
+
+    def __len__(self) -> int:
+        return len(self.planes)
+
+    def get(self, k: int) -> np.ndarray:
+        """
+        Schnitt k in µT der Form von U; wartet auf eine laufende Berechnung oder rechnet selbst. Auch die
+        eigene Berechnung wird als laufend eingetragen, gleichzeitige Anfragen warten darauf.
+        Danach werden die Nachbarn k ± 1..prefetch im Hintergrund angestossen.
+        """
+        k = int(np.clip(k, 0, len(self) - 1))
+        foreground = False
+        with self._lock:
+            entry = self.slices.lookup(k)
+            pending = self._pending.get(k)
+            if entry is None and pending is None:
+                pending = self._pending[k] = Future()
+                foreground = True
+        if foreground:
+            try:
+                pending.set_result(self._compute(k))
+            except Exception as error:
+                pending.set_exception(error)
+                raise
+        if entry is None:
+            entry = pending.result()
+        self._schedule_neighbours(k)
+        return entry
+
+    def get_nearest(self, values: np.ndarray, value: float) -> np.ndarray:
+        # Schnitt zum nächstgelegenen Slider-Wert, values sind die Werte je Ebene (z.B. s_slices)
+        return self.get(int(np.argmin(np.abs(np.asarray(values) - value))))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _compute(self, k: int) -> np.ndarray:
+        # Ergebnis ablegen und den Eintrag in _pending entfernen, bei einem Fehler nur entfernen
+        try:
+            B = slice_stack.calculate_plane_stack(self.planes[k:k + 1], self.U, self.V, self.paths, self.I_rms,
+                                                  self.f, self.r_wire, self.mu_0)[0]
+        except Exception:
+            with self._lock:
+                self._pending.pop(k, None)
+            raise
+        with self._lock:
+            entry = self.slices.put(k, B)
+            self._pending.pop(k, None)
+        return entry
+
+    def _schedule_neighbours(self, k: int) -> None:
+        # Nachbarn in der Reihenfolge der Entfernung einplanen, bereits vorhandene oder laufende überspringen
+        neighbours = [k + sign * d for d in range(1, self.prefetch + 1) for sign in (1, -1)]
+        with self._lock:
+            for n in neighbours:
+                if 0 <= n < len(self) and n not in self.slices and n not in self._pending:
+                    self._pending[n] = self._executor.submit(self._compute, n)
+
+
+def run_slice_viewer(views: dict[str, tuple[SliceServer, np.ndarray, Callable[[np.ndarray, float], Any]]],
+                     title: str = "Schnitte", unit: str = "m", **run_kwargs: Any) -> None:
+    """
+    Taipy-Oberfläche mit Auswahl der Ansicht, Slider und Plotly-Diagramm; berechnet wird nur der
+    angezeigte Schnitt (plus Vorausberechnung der Nachbarn).
+
+    Args:
+        views: Je Ansicht (SliceServer, Slider-Werte je Ebene, Funktion (Schnitt in µT, Slider-Wert) -> Figure)
+        title: Seitentitel
+        unit: Einheit der Slider-Werte
+        run_kwargs: Weitere Argumente für Gui.run, z.B. port oder run_browser
+    """
+    from taipy.gui import Gui
+
+    # Taipy bindet die lokalen Variablen dieser Funktion (view, index, max_index, label, figure) an die Seite,
+    # daher die noqa-Markierungen der nur dort verwendeten Variablen
+    view_names = list(views)
+    view = view_names[0]
+    index = 0
+    max_index = len(views[view][1]) - 1  # noqa: F841
+
+    def get_label(name: str, k: int) -> str:
+        return f"{name}: {views[name][1][k]:.0f} {unit}"
+
+    def get_figure(name: str, k: int) -> Any:
+        server, values, make_figure = views[name]
+        return make_figure(server.get(k), float(values[k]))
+
+    label = get_label(view, index)  # noqa: F841
+    figure = get_figure(view, index)  # noqa: F841
+
+    def on_change(state: Any, var_name: str, value: Any) -> None:
+        if var_name == "view":
+            state.index = 0
+            state.max_index = len(views[value][1]) - 1
+        if var_name in ("view", "index"):
+            state.label = get_label(state.view, int(state.index))
+            state.figure = get_figure(state.view, int(state.index))
+
+    page = (f"# {title}\n\n"
+            "<|{view}|toggle|lov={view_names}|>\n\n"
+            "<|{index}|slider|min=0|max={max_index}|continuous=False|> <|{label}|text|>\n\n"
+            "<|chart|figure={figure}|height=800px|>\n")
+    try:
+        gui = Gui(page)
+        gui.on_change = on_change
+        gui.run(title=title, **run_kwargs)
+    finally:
+        for server, _, _ in views.values():
+            server.close()
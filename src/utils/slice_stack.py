@@ -0,0 +1,176 @@
+import multiprocessing as mp
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from src.utils import biot_savart
+from src.utils.conductors import ConductorPath
+
+
+@dataclass
+class PlaneStack:
+    """
+    Stapel von Schnittebenen: Ebene k enthält die Punkte origins[k] + U * u_axes[k] + V * v_axes[k].
+    Die Achsen sind frei wählbar, damit sind auch beliebig schräge Ebenen möglich.
+
+    Attributes:
+        origins: Ursprünge der Ebenen, Form (K, 3) in m
+        u_axes: Erste Ebenenachse je Ebene, Form (K, 3)
+        v_axes: Zweite Ebenenachse je Ebene, Form (K, 3)
+    """
+    origins: np.ndarray
+    u_axes: np.ndarray
+    v_axes: np.ndarray
+
+    def __post_init__(self) -> None:
+        self.origins, self.u_axes, self.v_axes = (np.atleast_2d(np.asarray(a, dtype=float))
+                                                  for a in (self.origins, self.u_axes, self.v_axes))
+        if not self.origins.shape == self.u_axes.shape == self.v_axes.shape or self.origins.shape[1] != 3:
+            raise ValueError("Ursprünge und Achsen der Schnittebenen benötigen die gleiche Form (K, 3)")
+
+    def __len__(self) -> int:
+        return len(self.origins)
+
+    def __getitem__(self, index: slice | np.ndarray) -> "PlaneStack":
+        return PlaneStack(self.origins[index], self.u_axes[index], self.v_axes[index])
+
+    def get_points(self, U: np.ndarray, V: np.ndarray) -> np.ndarray:
+        # Punktwolke aller Ebenen der Form (K * U.size, 3), Ebene für Ebene
+        U_flat, V_flat = (np.ravel(a)[None, :, None] for a in np.broadcast_arrays(U, V))
+        points = self.origins[:, None, :] + U_flat * self.u_axes[:, None, :] + V_flat * self.v_axes[:, None, :]
+        return points.reshape(-1, 3)
+
+    def get_grids(self, k: int, U: np.ndarray, V: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Koordinatengitter (X, Y, Z) der Ebene k
+        o, u, v = self.origins[k], self.u_axes[k], self.v_axes[k]
+        return tuple(o[i] + U * u[i] + V * v[i] for i in range(3))
+
+
+def get_front_slice_planes(s_values: np.ndarray, alpha_rad: float) -> PlaneStack:
+    """
+    Frontschnitte senkrecht zur lokalen Leitungsrichtung wie im Skript: für s <= 0 entlang der
+    Zuleitung in z-Richtung, für s > 0 entlang des um alpha_rad abgewinkelten Abschnitts. V ist die Höhe y.
+    """
+    s_values = np.asarray(s_values, dtype=float)
+    t_dir = np.array([np.sin(alpha_rad), 0.0, np.cos(alpha_rad)])
+    x_axis = np.array([np.cos(alpha_rad), 0.0, -np.sin(alpha_rad)])
+    before_bend = (s_values <= 0)[:, None]
+    origins = np.where(before_bend, s_values[:, None] * [0.0, 0.0, 1.0], s_values[:, None] * t_dir)
+    u_axes = np.where(before_bend, [1.0, 0.0, 0.0], x_axis)
+    v_axes = np.tile([0.0, 1.0, 0.0], (len(s_values), 1))
+    return PlaneStack(origins, u_axes, v_axes)
+
+
+def get_top_slice_planes(y_values: np.ndarray) -> PlaneStack:
+    # Draufsichten auf Höhe y: U entspricht x, V entspricht z
+    y_values = np.asarray(y_values, dtype=float)
+    origins = np.zeros((len(y_values), 3))
+    origins[:, 1] = y_values
+    return PlaneStack(origins, np.tile([1.0, 0.0, 0.0], (len(y_values), 1)),
+                      np.tile([0.0, 0.0, 1.0], (len(y_values), 1)))
+
+
+def calculate_plane_stack(planes: PlaneStack, U: np.ndarray, V: np.ndarray, paths: list[ConductorPath],
+                          I_rms: float, f: float, r_wire: float = biot_savart.R_WIRE, mu_0: float = biot_savart.MU_0,
+                          mode: str = "phasor", max_memory: int = biot_savart.DEFAULT_MAX_MEMORY,
+                          dtype: type = np.float64) -> np.ndarray:
+    """
+    Berechnet alle Schnittebenen in einem vektorisierten Durchlauf über die gemeinsame Punktwolke
+    (Ebenen × U × V), blockweise innerhalb des Speicherbudgets.
+
+    Args:
+        planes: Schnittebenen mit Ursprüngen und Achsen
+        U, V: Ebenenkoordinaten [m], gleiche Form für alle Ebenen
+        paths: Leiterverläufe mit Phasenlage 'shift'
+        I_rms: Effektivwert des Leiterstroms [A]
+        f: Frequenz [Hz]
+        r_wire: Leiterradius [m]
+        mu_0: Magnetische Feldkonstante [Vs/Am]
+        mode: "phasor" (exakt) oder "time_steps" (12 Zeitschritte als Referenz)
+        max_memory: Speicherbudget der Zwischenergebnisse in Bytes
+        dtype: Rechen-Datentyp, np.float32 mit Genauigkeitsprüfung gegen float64
+
+    Returns:
+        Effektivwerte von B in µT der Form (K, *U.shape)
+    """
+    points = planes.get_points(U, V)
+    B_rms = biot_savart.calculate_rms_chunked(points, paths, I_rms, f, r_wire, mu_0, mode, max_memory, dtype)
+    return B_rms.reshape(len(planes), *np.broadcast(U, V).shape) * 1e6
+
+
+# Zustand der Worker-Prozesse, wird einmal je Prozess im Initializer gesetzt
+_worker_state: dict[str, Any] = {}
+
+
+def _init_worker(shared_result: Any, shape: tuple[int, ...], planes: PlaneStack, U: np.ndarray, V: np.ndarray,
+                 paths: list[ConductorPath], field_kwargs: dict[str, Any]) -> None:
+    _worker_state.update(result=np.frombuffer(shared_result, dtype=np.float64).reshape(shape), planes=planes,
+                         U=U, V=V, paths=paths, field_kwargs=field_kwargs)
+
+
+def _compute_planes(block: slice) -> slice:
+    # Rechnet einen Block von Ebenen und schreibt direkt in das gemeinsame Ergebnis-Array
+    state = _worker_state
+    state["result"][block] = calculate_plane_stack(state["planes"][block], state["U"], state["V"], state["paths"],
+                                                   **state["field_kwargs"])
+    return block
+
+
+def _get_mp_context(allow_spawn: bool) -> mp.context.BaseContext | None:
+    # spawn führt das aufrufende Skript in jedem Worker erneut aus, daher nur auf Wunsch (mit __main__-Guard)
+    if "fork" in mp.get_all_start_methods():
+        return mp.get_context("fork")
+    return mp.get_context("spawn") if allow_spawn else None
+
+
+def build_slice_stack(planes: PlaneStack, U: np.ndarray, V: np.ndarray, paths: list[ConductorPath], I_rms: float,
+                      f: float, r_wire: float = biot_savart.R_WIRE, mu_0: float = biot_savart.MU_0,
+                      mode: str = "phasor", n_workers: int | None = None, allow_spawn: bool = False,
+                      dtype: type = np.float64) -> np.ndarray:
+    """
+    Berechnet einen Stapel von Schnittebenen parallel in einem Prozess-Pool, jeder Worker rechnet
+    Blöcke von Ebenen mit calculate_plane_stack.
+    Die Worker schreiben in ein Shared-Memory-Array, es werden keine Ergebnis-Arrays zurückgepickelt.
+    Die Reihenfolge entspricht immer der Reihenfolge der Ebenen.
+
+    Args:
+        planes: Schnittebenen
+        U, V: Ebenenkoordinaten [m], gleiche Form für alle Ebenen
+        paths: Leiterverläufe mit Phasenlage 'shift'
+        I_rms: Effektivwert des Leiterstroms [A]
+        f: Frequenz [Hz]
+        r_wire: Leiterradius [m]
+        mu_0: Magnetische Feldkonstante [Vs/Am]
+        mode: "phasor" (exakt) oder "time_steps" (12 Zeitschritte als Referenz)
+        n_workers: Anzahl Prozesse, Standard ist die Anzahl CPU-Kerne; 1 rechnet seriell
+        allow_spawn: Pool auch ohne fork (Windows) starten, nur wenn das Skript per __main__-Guard geschützt ist;
+            sonst wird dort mit RuntimeWarning seriell gerechnet
+        dtype: Rechen-Datentyp, np.float32 mit Genauigkeitsprüfung gegen float64
+
+    Returns:
+        Effektivwerte von B in µT der Form (K, *U.shape)
+    """
+    field_kwargs = dict(I_rms=I_rms, f=f, r_wire=r_wire, mu_0=mu_0, mode=mode, dtype=dtype)
+    shape = (len(planes), *np.shape(U))
+    n_workers = min(n_workers or os.cpu_count() or 1, len(planes))
+    ctx = _get_mp_context(allow_spawn)
+
+    if n_workers > 1 and ctx is None:
+        warnings.warn(f"Kein fork verfügbar, {len(planes)} Ebenen werden seriell statt mit {n_workers} Prozessen "
+                      f"gerechnet; allow_spawn=True nutzt spawn (Skript mit __main__-Guard)", RuntimeWarning,
+                      stacklevel=2)
+    if n_workers <= 1 or ctx is None:
+        return calculate_plane_stack(planes, U, V, paths, **field_kwargs)
+
+    # Gemeinsamer Speicher ohne Lock, jeder Worker schreibt nur seine eigenen Ebenen
+    shared_result = ctx.RawArray('d', int(np.prod(shape)))
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(shared_result, shape, planes, U, V, paths, field_kwargs)) as executor:
+        # Einige Blöcke je Worker für einen Lastausgleich, jeder Block ein gestapelter Durchlauf
+        bounds = np.linspace(0, len(planes), min(len(planes), 4 * n_workers) + 1).astype(int)
+        list(executor.map(_compute_planes, [slice(k0, k1) for k0, k1 in zip(bounds[:-1], bounds[1:])]))
+    return np.frombuffer(shared_result, dtype=np.float64).reshape(shape)
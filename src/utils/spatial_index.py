@@ -0,0 +1,193 @@
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from src.utils import biot_savart
+from src.utils.conductors import ConductorSet, Conductors, get_segment_groups, get_segment_set, get_shifts
+
+# Einflussradius um die Leitersegmente in m, innerhalb wird immer exakt gerechnet
+DEFAULT_INFLUENCE_RADIUS = 100.0
+
+# Kantenlänge der Zellen des Gitterindex in m
+DEFAULT_CELL_SIZE = 50.0
+
+# Schwelle in µT: Punkte ausserhalb des Einflussradius, deren Schranke darunter liegt, werden nicht gerechnet
+DEFAULT_THRESHOLD = 1.0
+
+
+@dataclass
+class CulledField:
+    """
+    Ergebnis der Auswertung mit Einflussradius.
+
+    Attributes:
+        B: Effektivwerte in µT (N,); exakt für ausgewertete Punkte, sonst obere Schranke
+        evaluated: Maske der exakt ausgewerteten Punkte (N,)
+    """
+    B: np.ndarray
+    evaluated: np.ndarray
+
+
+def get_segment_distances(points: np.ndarray, starts: np.ndarray, ends: np.ndarray, start_infinite: np.ndarray,
+                          end_infinite: np.ndarray) -> np.ndarray:
+    """
+    Kürzeste Abstände der Punkte zu den (halbunendlichen) Segmenten.
+
+    Args:
+        points: Punkte (P, 3) [m]
+        starts, ends: Anfangs- und Endpunkte der Segmente (S, 3) [m]
+        start_infinite, end_infinite: Segment beginnt bzw. endet im Unendlichen (S,)
+
+    Returns:
+        Abstände der Form (S, P) [m]
+    """
+    vectors = ends - starts
+    lengths = np.linalg.norm(vectors, axis=1)
+    units = vectors / lengths[:, None]
+    r = points[None, :, :] - starts[:, None, :]
+    t = np.einsum('spi,si->sp', r, units)
+    t = np.clip(t, np.where(start_infinite, -np.inf, 0.0)[:, None], np.where(end_infinite, np.inf, lengths)[:, None])
+    return np.linalg.norm(r - t[:, :, None] * units[:, None, :], axis=2)
+
+
+class ReceptorIndex:
+    """
+    Gitterindex über eine grosse Menge von Aufpunkten (z.B. alle Gebäudepunkte einer Gemeinde): die Punkte
+    werden würfelförmigen Zellen zugeordnet und nach Zelle sortiert. Abstände und Schranken werden zuerst je
+    Zelle mit dem Zellmittelpunkt gerechnet (Abstand um die halbe Zelldiagonale verkleinert, damit für alle
+    Punkte der Zelle gültig). Der Index hängt nur von den Punkten ab und wird für beliebige Leitungsvarianten
+    wiederverwendet.
+    """
+
+    def __init__(self, points: Any, cell_size: float = DEFAULT_CELL_SIZE) -> None:
+        """
+        Ordnet die Punkte den Zellen zu.
+
+        Args:
+            points: Aufpunkte der Form (N, 3) [m]
+            cell_size: Kantenlänge der Zellen [m]
+        """
+        self.points: np.ndarray = np.ascontiguousarray(points, dtype=float).reshape(-1, 3)
+        origin = self.points.min(axis=0)
+        keys = np.floor((self.points - origin) / cell_size).astype(np.int64)
+        dims = keys.max(axis=0) + 1
+        cells, inverse, counts = np.unique((keys[:, 0] * dims[1] + keys[:, 1]) * dims[2] + keys[:, 2],
+                                           return_inverse=True, return_counts=True)
+        cell_keys = np.stack([cells // (dims[1] * dims[2]), (cells // dims[2]) % dims[1], cells % dims[2]], axis=1)
+        self.centers: np.ndarray = origin + (cell_keys + 0.5) * cell_size
+        self.half_diagonal: float = np.sqrt(3) / 2 * cell_size
+        self.cell_of_point: np.ndarray = inverse.ravel()
+        self.counts: np.ndarray = counts
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    @property
+    def n_cells(self) -> int:
+        return len(self.centers)
+
+    def get_cell_points(self, cells: np.ndarray) -> np.ndarray:
+        # Indizes aller Punkte der Zellen mit cells[k] == True
+        return np.nonzero(cells[self.cell_of_point])[0]
+
+
+def get_upper_bound(points: np.ndarray, paths: Conductors, I_rms: float | np.ndarray, mu_0: float = biot_savart.MU_0,
+                    margin: float = 0.0) -> np.ndarray:
+    """
+    Obere Schranke des Effektivwerts von B ohne Auswertung des Kernels. Je Segment gilt
+    |B| <= mu_0 |I| / (2 pi d) mit d = Abstand zum Segment. Sind die Leiter verschobene Kopien voneinander
+    (Drehstromsystem), wird zusätzlich die Auslöschung genutzt: mit dem Bezugssegment u_0 der Gruppe ist
+    B = (Σ I_c) u_0 + Σ I_c (u_c - u_0) und |u_c - u_0| <= delta_c mu_0 / (pi (d - delta_c)²)
+    (Gradientenschranke des Segmentfelds, delta_c = Verschiebung des Leiters), die Schranke fällt dann wie 1/d².
+
+    Args:
+        points: Punkte (P, 3) [m]
+        paths: Leiterverläufe mit Phasenlage 'shift' oder Leitertabelle (ConductorSet)
+        I_rms: Effektivwert des Leiterstroms [A], Skalar oder je Leiter (C,)
+        mu_0: Magnetische Feldkonstante [Vs/Am]
+        margin: Abzug von allen Abständen [m], z.B. halbe Zelldiagonale für eine Schranke aller Punkte einer Zelle
+
+    Returns:
+        Obere Schranke des Effektivwerts in µT (P,)
+    """
+    phasors = np.abs(biot_savart.get_phase_current_phasor(I_rms, get_shifts(paths)))
+    segments = get_segment_set(paths)
+    distances = get_segment_distances(points, segments.starts, segments.ends, segments.start_infinite,
+                                      segments.end_infinite)
+    with np.errstate(divide='ignore'):
+        inv_distances = 1.0 / np.maximum(distances - margin, 0.0)
+    per_conductor = np.add.reduceat(inv_distances, segments.offsets, axis=0)
+    bound = mu_0 / (2 * np.pi) * (phasors @ per_conductor)
+
+    groups = get_segment_groups(paths.get_paths() if isinstance(paths, ConductorSet) else paths)
+    if groups is not None:
+        currents = biot_savart.get_phase_current_phasor(I_rms, get_shifts(paths)) * np.ones(len(phasors))
+        group_bound = np.zeros(len(points))
+        for group in groups:
+            start = group.start[None, :]
+            d = get_segment_distances(points, start, start + group.length * group.unit[None, :],
+                                      np.array([group.start_infinite]), np.array([group.end_infinite]))[0] - margin
+            deltas = np.sqrt(group.a**2 + np.abs(group.b)**2)
+            gap = np.maximum(d[None, :] - deltas[:, None], 0.0)
+            with np.errstate(divide='ignore'):
+                group_bound += (mu_0 / (2 * np.pi) * np.abs(currents.sum()) / np.maximum(d, 0.0)
+                                + mu_0 / np.pi * (phasors * deltas) @ (1.0 / gap**2))
+        bound = np.minimum(bound, group_bound)
+    return bound / np.sqrt(2) * 1e6
+
+
+def calculate_field_points_culled(points: Any, paths: Conductors, I_rms: float | np.ndarray, f: float,
+                                  radius: float = DEFAULT_INFLUENCE_RADIUS, threshold: float = DEFAULT_THRESHOLD,
+                                  r_wire: float = biot_savart.R_WIRE, mu_0: float = biot_savart.MU_0,
+                                  max_memory: int = biot_savart.DEFAULT_MAX_MEMORY,
+                                  index: ReceptorIndex | None = None) -> CulledField:
+    """
+    Effektivwert von B an vielen Aufpunkten mit Einflussradius: exakt gerechnet werden nur Punkte innerhalb
+    des Radius um ein Segment oder mit oberer Schranke >= threshold, alle übrigen erhalten die Schranke.
+    Für Vergleiche mit einem Grenzwert <= threshold ist das Ergebnis damit konservativ und vollständig.
+
+    Args:
+        points: Aufpunkte der Form (N, 3) [m], entfällt mit index (None übergeben)
+        paths: Leiterverläufe mit Phasenlage 'shift' oder Leitertabelle (ConductorSet)
+        I_rms: Effektivwert des Leiterstroms [A], Skalar oder je Leiter (C,)
+        f: Frequenz [Hz]
+        radius: Einflussradius [m]
+        threshold: Schwelle der oberen Schranke in µT
+        r_wire: Leiterradius [m]
+        mu_0: Magnetische Feldkonstante [Vs/Am]
+        max_memory: Speicherbudget der blockweisen Auswertung in Bytes
+        index: Vorhandener ReceptorIndex über die Aufpunkte
+
+    Returns:
+        CulledField
+    """
+    index = index if index is not None else ReceptorIndex(points)
+    segments = get_segment_set(paths)
+    chunk_size = max(1, max_memory // (8 * 8 * (len(segments) + 1)))
+
+    def screen(points: np.ndarray, margin: float) -> tuple[np.ndarray, np.ndarray]:
+        # Obere Schranke und Maske "exakt rechnen" (im Einflussradius oder Schranke >= threshold), blockweise
+        bounds, critical = np.empty(len(points)), np.empty(len(points), dtype=bool)
+        for i0 in range(0, len(points), chunk_size):
+            block = points[i0:i0 + chunk_size]
+            distances = get_segment_distances(block, segments.starts, segments.ends, segments.start_infinite,
+                                              segments.end_infinite).min(axis=0)
+            bounds[i0:i0 + chunk_size] = get_upper_bound(block, paths, I_rms, mu_0, margin)
+            critical[i0:i0 + chunk_size] = ((distances - margin <= radius)
+                                            | (bounds[i0:i0 + chunk_size] >= threshold))
+        return bounds, critical
+
+    # Stufe 1 je Zelle: Schranke gilt für alle Punkte der Zelle, unkritische Zellen sind damit erledigt
+    cell_bounds, critical_cells = screen(index.centers, index.half_diagonal)
+    B = cell_bounds[index.cell_of_point]
+    evaluated = np.zeros(len(index), dtype=bool)
+
+    # Stufe 2 je Punkt in den kritischen Zellen
+    candidates = index.get_cell_points(critical_cells)
+    B[candidates], evaluated[candidates] = screen(index.points[candidates], 0.0)
+
+    if evaluated.any():
+        B[evaluated] = biot_savart.calculate_field_points(index.points[evaluated], paths, I_rms, f, r_wire, mu_0,
+                                                          max_memory=max_memory)
+    return CulledField(B, evaluated)
@@ -0,0 +1,247 @@
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.utils import biot_savart
+from src.utils.conductors import Conductors
+
+# Punkte je Block beim Füllen; Koordinaten (8 Bytes × 3) und Ergebnis je Block bleiben damit klein
+DEFAULT_BLOCK_POINTS = 256 * 1024
+
+AXES_SUFFIX = ".axes.npz"
+
+# Eigenes Verzeichnis der Volumen, getrennt vom ResultCache (dessen Verdrängung kennt die Volumen nicht)
+DEFAULT_VOLUME_DIRECTORY = ".field_volumes"
+
+
+@dataclass
+class VolumeStatistics:
+    """
+    Kennwerte eines Volumens.
+
+    Attributes:
+        max: Maximum in µT
+        mean: Mittelwert in µT
+        fraction_above: Anteil der Punkte mit B >= level
+        level: Grenzwert in µT
+    """
+    max: float
+    mean: float
+    fraction_above: float
+    level: float
+
+
+class FieldVolume:
+    """
+    Effektivwerte von B auf einem achsparallelen 3D-Gitter als np.memmap (.npy-Datei, Form (nx, ny, nz),
+    Indizierung wie np.meshgrid(x, y, z, indexing='ij')). Koordinaten werden aus den Achsvektoren abgeleitet,
+    es entstehen keine Koordinatengitter; gefüllt und gelesen wird blockweise, der Arbeitsspeicher hängt
+    damit nicht von der Auflösung ab. Die Achsen werden erst mit flush (am Ende von fill) neben die Datei
+    geschrieben, ein abgebrochenes Füllen hinterlässt damit kein scheinbar gültiges Volumen.
+    """
+
+    def __init__(self, path: str | Path, x: np.ndarray, y: np.ndarray, z: np.ndarray, data: np.memmap) -> None:
+        self.path: Path = Path(path)
+        self.x, self.y, self.z = (np.asarray(a, dtype=float) for a in (x, y, z))
+        self.data: np.memmap = data
+
+    @classmethod
+    def create(cls, path: str | Path, x: Any, y: Any, z: Any, dtype: type = np.float32) -> "FieldVolume":
+        """
+        Legt ein leeres Volumen auf der Festplatte an.
+
+        Args:
+            path: Pfad der .npy-Datei, die Achsen liegen nach flush daneben in <path>.axes.npz
+            x, y, z: Achsvektoren [m]
+            dtype: Datentyp der gespeicherten Werte, float32 halbiert den Platzbedarf
+
+        Returns:
+            FieldVolume (beschreibbar)
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        x, y, z = (np.asarray(a, dtype=float) for a in (x, y, z))
+        _axes_path(path).unlink(missing_ok=True)
+        data = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(len(x), len(y), len(z)))
+        return cls(path, x, y, z, data)
+
+    @classmethod
+    def open(cls, path: str | Path, mode: str = 'r') -> "FieldVolume":
+        # Vorhandenes Volumen öffnen, standardmässig schreibgeschützt
+        path = Path(path)
+        with np.load(_axes_path(path)) as axes:
+            x, y, z = axes['x'], axes['y'], axes['z']
+        return cls(path, x, y, z, np.load(path, mmap_mode=mode))
+
+    @classmethod
+    def get_or_fill(cls, path: str | Path, x: Any, y: Any, z: Any, paths: Conductors, I_rms: float | np.ndarray,
+                    f: float, **kwargs: Any) -> "FieldVolume":
+        # Vollständiges Volumen öffnen oder neu anlegen und füllen (kwargs wie bei fill)
+        if cls.exists(path):
+            return cls.open(path)
+        return cls.create(path, x, y, z).fill(paths, I_rms, f, **kwargs)
+
+    @staticmethod
+    def exists(path: str | Path) -> bool:
+        # Vollständig gefülltes Volumen vorhanden (Daten und Achsen)
+        return Path(path).exists() and _axes_path(Path(path)).exists()
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        return self.data.shape
+
+    @property
+    def n_points(self) -> int:
+        return self.data.size
+
+    def get_points(self, start: int, stop: int) -> np.ndarray:
+        # Koordinaten der flachen Indizes start..stop (C-Reihenfolge) der Form (n, 3), direkt aus den Achsen
+        ix, iy, iz = np.unravel_index(np.arange(start, stop), self.shape)
+        return np.stack([self.x[ix], self.y[iy], self.z[iz]], axis=1)
+
+    def fill(self, paths: Conductors, I_rms: float | np.ndarray, f: float, r_wire: float = biot_savart.R_WIRE,
+             mu_0: float = biot_savart.MU_0, block_points: int = DEFAULT_BLOCK_POINTS,
+             max_memory: int = biot_savart.DEFAULT_MAX_MEMORY, dtype: type = np.float64) -> "FieldVolume":
+        """
+        Berechnet das Volumen blockweise und schreibt jeden Block direkt in die Datei.
+
+        Args:
+            paths: Leiterverläufe mit Phasenlage 'shift' oder Leitertabelle (ConductorSet)
+            I_rms: Effektivwert des Leiterstroms [A], Skalar oder je Leiter (C,)
+            f: Frequenz [Hz]
+            r_wire: Leiterradius [m]
+            mu_0: Magnetische Feldkonstante [Vs/Am]
+            block_points: Punkte je geschriebenem Block
+            max_memory: Speicherbudget der Kernel-Zwischenergebnisse in Bytes
+            dtype: Rechen-Datentyp, np.float32 mit Genauigkeitsprüfung
+
+        Returns:
+            self
+        """
+        flat = self.data.reshape(-1)
+        for i0 in range(0, self.n_points, block_points):
+            i1 = min(i0 + block_points, self.n_points)
+            flat[i0:i1] = biot_savart.calculate_field_points(self.get_points(i0, i1), paths, I_rms, f, r_wire, mu_0,
+                                                             max_memory=max_memory, dtype=dtype)
+        self.flush()
+        return self
+
+    def flush(self) -> None:
+        # Daten auf die Festplatte schreiben und das Volumen mit den Achsen als vollständig markieren
+        self.data.flush()
+        np.savez(_axes_path(self.path), x=self.x, y=self.y, z=self.z)
+
+    def window(self, x_range: tuple[float, float] | None = None, y_range: tuple[float, float] | None = None,
+               z_range: tuple[float, float] | None = None,
+               step: int = 1) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Ausschnitt als Sicht auf die Datei (nur die gelesenen Seiten werden geladen).
+
+        Args:
+            x_range, y_range, z_range: Koordinatenbereiche [m], None für die ganze Achse
+            step: Schrittweite der Ausdünnung je Achse
+
+        Returns:
+            Achsvektoren x, y, z des Ausschnitts und Werte in µT der Form (nx', ny', nz')
+        """
+        slices = tuple(_get_axis_slice(axis, bounds, step) for axis, bounds in
+                       zip((self.x, self.y, self.z), (x_range, y_range, z_range)))
+        return self.x[slices[0]], self.y[slices[1]], self.z[slices[2]], self.data[slices]
+
+    def get_slice(self, axis: int, value: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Schnitt senkrecht zu einer Achse an der nächstgelegenen Gitterebene.
+
+        Args:
+            axis: 0 (x), 1 (y) oder 2 (z)
+            value: Koordinate des Schnitts [m]
+
+        Returns:
+            Achsvektoren der beiden verbleibenden Achsen und Werte in µT als Sicht auf die Datei
+        """
+        axes = (self.x, self.y, self.z)
+        index = int(np.argmin(np.abs(axes[axis] - value)))
+        remaining = [axes[i] for i in range(3) if i != axis]
+        return remaining[0], remaining[1], self.data[(slice(None),) * axis + (index,)]
+
+    def iter_slabs(self, slab_size: int = 1) -> Iterator[tuple[int, np.ndarray]]:
+        # Scheiben entlang x (zusammenhängend in der Datei) als (Startindex, Werte der Form (n, ny, nz))
+        for i0 in range(0, self.shape[0], slab_size):
+            yield i0, np.asarray(self.data[i0:i0 + slab_size])
+
+    def get_statistics(self, level: float = 1.0, block_points: int = DEFAULT_BLOCK_POINTS) -> VolumeStatistics:
+        # Maximum, Mittelwert und Anteil über dem Grenzwert, scheibenweise gelesen
+        slab_size = max(1, block_points // (self.shape[1] * self.shape[2]))
+        maximum, total, above = -np.inf, 0.0, 0
+        for _, slab in self.iter_slabs(slab_size):
+            maximum = max(maximum, float(slab.max()))
+            total += float(slab.sum(dtype=np.float64))
+            above += int(np.count_nonzero(slab >= level))
+        return VolumeStatistics(maximum, total / self.n_points, above / self.n_points, level)
+
+    def get_isosurface_data(self, step: int = 1, **ranges: Any) -> tuple[np.ndarray, ...]:
+        """
+        Flache Koordinaten und Werte eines (ausgedünnten) Ausschnitts, z.B. für go.Isosurface.
+
+        Args:
+            step: Schrittweite der Ausdünnung je Achse
+            ranges: x_range, y_range, z_range wie bei window
+
+        Returns:
+            X, Y, Z und Werte in µT, je flach mit gleicher Länge
+        """
+        x, y, z, values = self.window(step=step, **ranges)
+        X, Y, Z = np.meshgrid(x, y, z, indexing='ij')
+        return X.ravel(), Y.ravel(), Z.ravel(), np.asarray(values, dtype=float).ravel()
+
+
+def get_volume_path(key: str, directory: str | Path = DEFAULT_VOLUME_DIRECTORY,
+                    version: int | str = biot_savart.KERNEL_VERSION) -> Path:
+    # Pfad eines Volumens zum Fingerabdruck key, z.B. aus result_cache.fingerprint_inputs, je KERNEL_VERSION;
+    # Volumen anderer Versionen im Verzeichnis werden dabei gelöscht (wie im ResultCache)
+    directory = Path(directory)
+    prune_volumes(directory, version)
+    return directory / f"{key}-v{version}.npy"
+
+
+def prune_volumes(directory: str | Path = DEFAULT_VOLUME_DIRECTORY,
+                  version: int | str = biot_savart.KERNEL_VERSION) -> int:
+    """
+    Löscht Volumen (Daten und Achsen) anderer Versionen der Feldberechnung.
+
+    Args:
+        directory: Verzeichnis der Volumen
+        version: Aktuelle Version, deren Volumen bleiben
+
+    Returns:
+        Anzahl gelöschter Dateien; unter Windows bleiben noch gemappte Dateien bis zum nächsten Aufruf liegen
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return 0
+    removed = 0
+    for path in directory.glob("*-v*.npy*"):
+        data_name = path.name.removesuffix(AXES_SUFFIX)
+        if data_name.endswith(".npy") and not data_name.endswith(f"-v{version}.npy"):
+            try:
+                path.unlink(missing_ok=True)
+                removed += 1
+            except PermissionError:
+                pass
+    return removed
+
+
+def _axes_path(path: Path) -> Path:
+    return path.with_name(path.name + AXES_SUFFIX)
+
+
+def _get_axis_slice(axis: np.ndarray, bounds: tuple[float, float] | None, step: int) -> slice:
+    # Indexbereich der Achse innerhalb von bounds (aufsteigende Achse)
+    if bounds is None:
+        return slice(None, None, step)
+    i0 = int(np.searchsorted(axis, bounds[0], side='left'))
+    i1 = int(np.searchsorted(axis, bounds[1], side='right'))
+    return slice(i0, i1, step)